@@ -25,6 +25,7 @@ def CellullarAutomataRule30(steps, size=21): #defines the size 21 as an odd numb
         state = newState
 
 
-CellullarAutomataRule30(10)
+if __name__ == "__main__":
+    CellullarAutomataRule30(10)
             
             
\ No newline at end of file
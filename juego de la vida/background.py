@@ -0,0 +1,148 @@
+import queue
+import threading
+import time
+import traceback
+
+import numpy as np
+
+# Simulación en un hilo aparte del dibujo. El hilo avanza la Simulation y
+# publica fotos (simulation.Frame) con doble búfer: mientras arma la
+# siguiente, el bucle de dibujo usa la última publicada, que nadie modifica.
+# Sólo este hilo toca la Simulation: las ediciones de la interfaz pasan por
+# edit(), que las encola y vuelve enseguida; el hilo las aplica entre un paso
+# y el siguiente y publica una foto nueva. Así un paso lento no frena la
+# ventana, sólo demora la edición.
+# En modo warp el hilo no espera entre generaciones y publica a lo sumo una
+# foto por cuadro, así corre todo lo que pueda sin frenar la ventana.
+
+
+def merge_changes(first, second):
+    # None significa "repintar todo" y gana sobre cualquier lista
+    if first is None or second is None:
+        return None
+    return np.concatenate((first, second))
+
+
+class SimulationThread:
+    def __init__(self, sim, rate=6, fps=60):
+        self.sim = sim
+        self.rate = rate  # generaciones por segundo fuera del modo warp
+        self.fps = fps
+        self.warp = False
+        self.playing = False
+        self.levels = ()  # niveles de la pirámide que se incluyen en las fotos
+        self.edits = queue.SimpleQueue()  # (función, argumentos, done)
+        self.frame_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.front = None
+        self.taken = False
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.publish()  # primera foto, antes de que arranque el hilo
+        self.thread = threading.Thread(target=self.run, name="simulacion", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def edit(self, fn, *args, done=None):
+        # encola fn(*args); `done(resultado)` se llama desde el hilo de la
+        # simulación cuando se aplicó. Los ValueError se informan ahí mismo.
+        self.edits.put((fn, args, done))
+        self.wake.set()
+
+    def apply_edits(self):
+        # las ediciones pendientes, entre un paso y el siguiente
+        if self.edits.empty():
+            return
+        while True:
+            try:
+                fn, args, done = self.edits.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                result = fn(*args)
+            except ValueError as error:
+                print(f"⚠ {error}")
+                continue
+            except Exception:
+                print("⚠ Error al aplicar un cambio:")
+                traceback.print_exc()
+                continue
+            if done is not None:
+                done(result)
+        self.publish()
+
+    def set_levels(self, levels):
+        self.levels = levels
+        self.edit(lambda: None)
+
+    def step(self):
+        # un paso pedido desde la interfaz (tecla N)
+        self.edit(self.advance)
+
+    def publish(self):
+        frame = self.sim.frame(changes=self.sim.take_changes(), levels=self.levels)
+        with self.frame_lock:
+            if self.front is not None and not self.taken:
+                # la foto anterior no llegó a dibujarse: se suman sus cambios
+                frame.changes = merge_changes(self.front.changes, frame.changes)
+            self.front = frame
+            self.taken = False
+
+    def take(self):
+        # (última foto, True si no se había tomado antes)
+        with self.frame_lock:
+            fresh = not self.taken
+            self.taken = True
+            return self.front, fresh
+
+    def advance(self):
+        try:
+            cycle = self.sim.step()
+        except Exception:
+            # un paso que falla detiene la reproducción sin matar el hilo
+            self.playing = False
+            print("⚠ Error al avanzar la simulación; se detuvo la reproducción:")
+            traceback.print_exc()
+            return
+        if self.sim.population == 0:
+            self.playing = False
+            print("⚠ Todas las células han muerto.")
+        if cycle:
+            transient, period = cycle
+            print(f"⟳ Ciclo detectado: periodo {period}, transitorio {transient}")
+            if self.sim.stop_on_cycle:
+                self.playing = False
+
+    def run(self):
+        next_step = time.perf_counter()
+        last_publish = 0.0
+        while self.running:
+            self.apply_edits()
+            if not self.playing:
+                self.wake.wait(0.1)
+                self.wake.clear()
+                next_step = time.perf_counter()
+                continue
+            if not self.warp:
+                delay = next_step - time.perf_counter()
+                if delay > 0:
+                    self.wake.wait(delay)
+                    self.wake.clear()
+                    continue
+            self.advance()
+            now = time.perf_counter()
+            if not self.warp or not self.playing or now - last_publish >= 1 / self.fps:
+                self.publish()
+                last_publish = now
+            # si un paso tardó más que el intervalo no se acumulan atrasos
+            next_step = max(next_step + 1 / self.rate, now)
+            # suelta el GIL para que la ventana dibuje y atienda eventos
+            time.sleep(0)
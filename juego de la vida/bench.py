@@ -0,0 +1,213 @@
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import generations
+import ltl
+import simulation
+
+# Banco de pruebas: sopas aleatorias con semilla fija en varios tamaños,
+# densidades y reglas, medidas con cada motor de Simulation. Escribe un
+# reporte JSON y puede compararlo contra uno guardado antes.
+#   python bench.py --quick --output base.json
+#   python bench.py --quick --baseline base.json       # marca regresiones
+#   python bench.py --report nuevo.json --baseline base.json
+# La memoria es el pico de tracemalloc al crear el tablero y dar un paso
+# (incluye los arreglos de NumPy, no los procesos del motor "paralela").
+
+SIZES = [100, 500, 1000, 2000, 5000, 10000]
+DENSITIES = [0.001, 0.01, 0.1, 0.5]
+RULES = ["B3/S23", "B36/S23", "B2/S/C3"]
+QUICK = dict(sizes=[100, 1000], densities=[0.01, 0.15], rules=["B3/S23"])
+# los motores que trabajan con el set de posiciones no escalan a millones
+# de células vivas: por encima de este límite se omiten
+MAX_LIVE = {
+    "set": 2e5,
+    "hashlife": 2e5,
+    "dispersa": 2e6,
+}
+RULE30 = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bases", "CellullarAutomaton.py")
+
+
+def skip_reason(engine, rule, size, density):
+    live = size * size * density
+    if ltl.is_ltl(rule) or generations.is_generations(rule):
+        # las reglas de varios estados usan su propio mundo con cualquier motor
+        if engine != "densa":
+            return "regla de varios estados: sólo con densa"
+    if engine in MAX_LIVE and live > MAX_LIVE[engine]:
+        return f"{live:.0f} vivas > {MAX_LIVE[engine]:.0f}"
+    return None
+
+
+def make_simulation(engine, rule, size, density, seed):
+    # hashlife sólo corre en el plano infinito: la sopa es la misma, pero
+    # lo que sale del cuadro sigue vivo
+    boundary = "toro" if simulation.engine_allowed(engine, "toro") else "infinita"
+    sim = simulation.Simulation(size, size, rule, boundary, engine, timeline=False, detect_cycles=False)
+    sim.generate_random(density, seed)
+    kind = sim.native_kind()
+    # el set o el quadtree se arma fuera del tiempo medido, como lo tendría un frontend
+    if kind is None:
+        sim.positions
+    else:
+        sim.board(kind)
+    return sim
+
+
+def run_case(engine, rule, size, density, seed, min_time, max_gens):
+    # memoria: tablero + un paso bajo tracemalloc; tiempo: otra corrida sin él
+    tracemalloc.start()
+    sim = make_simulation(engine, rule, size, density, seed)
+    sim.step()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    sim.close()
+    sim = make_simulation(engine, rule, size, density, seed)
+    try:
+        sim.step()  # calentamiento: procesos, tablas y cachés
+        gens = 0
+        started = time.perf_counter()
+        while gens < max_gens:
+            sim.step()
+            gens += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time:
+                break
+        population = sim.population
+    finally:
+        sim.close()
+    return dict(generations=gens, seconds=elapsed, gens_per_s=gens / elapsed,
+                cells_per_s=size * size * gens / elapsed, population=population,
+                peak_mb=peak / 2 ** 20)
+
+
+def run_rule30(size, min_time, max_gens):
+    # el autómata elemental de bases/ imprime cada fila: se descarta la salida
+    spec = importlib.util.spec_from_file_location("CellullarAutomaton", RULE30)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    steps = 1
+    with contextlib.redirect_stdout(io.StringIO()):
+        while True:
+            started = time.perf_counter()
+            module.CellullarAutomataRule30(steps, size)
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_time or steps >= max_gens:
+                break
+            steps *= 2
+    return dict(generations=steps, seconds=elapsed, gens_per_s=steps / elapsed,
+                cells_per_s=size * steps / elapsed, population=None, peak_mb=None)
+
+
+def run_suite(sizes, densities, rules_, engines, seed=0, min_time=1.0, max_gens=1000, rule30=True):
+    results = []
+    for size in sizes:
+        for density in densities:
+            for rule in rules_:
+                for engine in engines:
+                    case = dict(engine=engine, rule=rule, size=size, density=density)
+                    reason = skip_reason(engine, rule, size, density)
+                    if reason:
+                        case["skipped"] = reason
+                    else:
+                        case.update(run_case(engine, rule, size, density, seed, min_time, max_gens))
+                        print(f"{engine:>9} {rule:>8} {size:>6}² {density:6.1%}  "
+                              f"{case['gens_per_s']:10.2f} gen/s  {case['cells_per_s']:12.3g} cél/s  "
+                              f"{case['peak_mb']:8.1f} MB", file=sys.stderr)
+                    results.append(case)
+        if rule30:
+            case = dict(engine="regla30", rule="1D", size=size, density=None)
+            case.update(run_rule30(size, min_time, max_gens))
+            print(f"{'regla30':>9} {'1D':>8} {size:>6}   {'':6}  {case['gens_per_s']:10.2f} gen/s  "
+                  f"{case['cells_per_s']:12.3g} cél/s", file=sys.stderr)
+            results.append(case)
+    return results
+
+
+def case_key(case):
+    return case["engine"], case["rule"], case["size"], case["density"]
+
+
+def compare(report, baseline, threshold=0.2):
+    # regresión: gen/s por debajo de (1 - threshold) veces la línea base
+    previous = {case_key(case): case for case in baseline["results"] if "skipped" not in case}
+    regressions = []
+    for case in report["results"]:
+        old = previous.get(case_key(case))
+        if old is None or "skipped" in case:
+            continue
+        ratio = case["gens_per_s"] / old["gens_per_s"]
+        mark = "  "
+        if ratio < 1 - threshold:
+            mark = "⚠ "
+            regressions.append(case)
+        elif ratio > 1 + threshold:
+            mark = "↑ "
+        engine, rule, size, density = case_key(case)
+        shape = f"{size:>6}² {density:6.1%}" if density is not None else f"{size:>6}  {'':6}"
+        print(f"{mark}{engine:>9} {rule:>8} {shape}  "
+              f"{old['gens_per_s']:10.2f} -> {case['gens_per_s']:10.2f} gen/s  ({ratio:.2f}x)")
+    print(f"{len(regressions)} regresiones (umbral {threshold:.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide los motores del autómata.")
+    parser.add_argument("--quick", action="store_true", help="matriz pequeña: " + json.dumps(QUICK))
+    parser.add_argument("--sizes", type=int, nargs="+")
+    parser.add_argument("--densities", type=float, nargs="+")
+    parser.add_argument("--rules", nargs="+")
+    parser.add_argument("--engines", nargs="+", default=simulation.ENGINES, choices=simulation.ENGINES)
+    parser.add_argument("--no-rule30", action="store_true", help="omitir la regla 30 de bases/")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-time", type=float, default=1.0, help="segundos medidos por caso")
+    parser.add_argument("--max-gens", type=int, default=1000)
+    parser.add_argument("--output", help="escribir el reporte JSON aquí")
+    parser.add_argument("--report", help="usar un reporte ya guardado en lugar de medir")
+    parser.add_argument("--baseline", help="reporte contra el que se buscan regresiones")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    if args.report:
+        with open(args.report) as f:
+            report = json.load(f)
+    else:
+        preset = QUICK if args.quick else dict(sizes=SIZES, densities=DENSITIES, rules=RULES)
+        sizes = args.sizes or preset["sizes"]
+        densities = args.densities or preset["densities"]
+        rules_ = args.rules or preset["rules"]
+        report = {
+            "meta": {
+                "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "seed": args.seed,
+                "min_time": args.min_time,
+            },
+            "results": run_suite(sizes, densities, rules_, args.engines, args.seed,
+                                 args.min_time, args.max_gens, not args.no_rule30),
+        }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import numpy as np
+
+# Motor empaquetado: cada fila del tablero se guarda en palabras uint64
+# (64 células por palabra, el bit i de la palabra j es la columna 64*j + i)
+# y la generación siguiente se calcula con sumadores completos bit a bit.
+
+WORD_BITS = 64
+
+
+def words_per_row(width):
+    return (width + WORD_BITS - 1) // WORD_BITS
+
+
+def pack_grid(grid):
+    height, width = grid.shape
+    packed = np.packbits(grid.astype(bool), axis=1, bitorder="little")
+    padded = np.zeros((height, words_per_row(width) * 8), dtype=np.uint8)
+    padded[:, :packed.shape[1]] = packed
+    return padded.view("<u8").astype(np.uint64)
+
+
+def unpack_grid(words, width):
+    raw = words.astype("<u8").view(np.uint8)
+    bits = np.unpackbits(raw, axis=1, bitorder="little")
+    return bits[:, :width]
+
+
+def positions_to_words(pos_set, width, height):
+    words = np.zeros((height, words_per_row(width)), dtype=np.uint64)
+    if pos_set:
+        cells = np.array(list(pos_set), dtype=np.int64).reshape(-1, 2)
+        cols, rows = cells[:, 0], cells[:, 1]
+        inside = (cols >= 0) & (cols < width) & (rows >= 0) & (rows < height)
+        cols, rows = cols[inside], rows[inside]
+        bits = np.left_shift(np.uint64(1), (cols % WORD_BITS).astype(np.uint64))
+        np.bitwise_or.at(words, (rows, cols // WORD_BITS), bits)
+    return words
+
+
+def words_to_positions(words, width):
+    rows, cols = np.nonzero(unpack_grid(words, width))
+    return set(zip(cols.tolist(), rows.tolist()))
+
+
+def set_cells(words):
+    # (filas, columnas) de los bits encendidos; sólo se desempaquetan los
+    # bytes distintos de cero
+    raw = words.astype("<u8").view(np.uint8)
+    # nonzero es varias veces más rápido sobre bool que sobre uint8
+    nonzero = np.flatnonzero(raw != 0)
+    if len(nonzero) * 4 > raw.size:
+        # con muchos bytes encendidos sale más barato desempaquetar todo
+        bits = np.unpackbits(raw, axis=1, bitorder="little")
+        return np.divmod(np.flatnonzero(bits.view(bool)), bits.shape[1])
+    bits = np.unpackbits(raw.ravel()[nonzero][:, None], axis=1, bitorder="little")
+    which, bit = np.nonzero(bits.view(bool))
+    rows, byte_col = np.divmod(nonzero[which], raw.shape[1])
+    return rows, byte_col * 8 + bit
+
+
+def diff_cells(old, new):
+    # (filas, columnas) de los bits distintos
+    return set_cells(old ^ new)
+
+
+def get_cells(words, rows, cols):
+    # estado (0/1) de células sueltas sin desempaquetar el tablero
+    return ((words[rows, cols // WORD_BITS] >> (cols % WORD_BITS).astype(np.uint64)) & np.uint64(1)).astype(np.uint8)
+
+
+def population(words):
+    return int(np.unpackbits(words.astype("<u8").view(np.uint8)).sum())
+
+
+def last_word_mask(width):
+    used = width % WORD_BITS
+    if used == 0:
+        return np.uint64(0xFFFFFFFFFFFFFFFF)
+    return np.uint64((1 << used) - 1)
+
+
+def shift_columns(words, width, boundary):
+    # west[c] = célula c - 1, east[c] = célula c + 1
+    one = np.uint64(1)
+    top = np.uint64(WORD_BITS - 1)
+    carry_in = np.zeros_like(words)
+    carry_in[:, 1:] = words[:, :-1] >> top
+    west = (words << one) | carry_in
+    carry_in = np.zeros_like(words)
+    carry_in[:, :-1] = words[:, 1:] << top
+    east = (words >> one) | carry_in
+    if boundary == "toro":
+        last_word, last_bit = divmod(width - 1, WORD_BITS)
+        last_bit = np.uint64(last_bit)
+        west[:, 0] |= (words[:, last_word] >> last_bit) & one
+        east[:, last_word] |= (words[:, 0] & one) << last_bit
+    return west, east
+
+
+def shift_rows(words, boundary):
+    # up[r] = fila r - 1, down[r] = fila r + 1
+    if boundary == "toro":
+        return np.roll(words, 1, axis=0), np.roll(words, -1, axis=0)
+    up = np.zeros_like(words)
+    down = np.zeros_like(words)
+    up[1:] = words[:-1]
+    down[:-1] = words[1:]
+    return up, down
+
+
+def full_adder(a, b, c):
+    partial = a ^ b
+    return partial ^ c, (a & b) | (c & partial)
+
+
+def neighbor_planes(words, width, boundary):
+    west, east = shift_columns(words, width, boundary)
+    n, s = shift_rows(words, boundary)
+    nw, sw = shift_rows(west, boundary)
+    ne, se = shift_rows(east, boundary)
+    # árbol de sumadores: 8 entradas de un bit -> conteo en 4 planos (1, 2, 4, 8)
+    s1, c1 = full_adder(nw, n, ne)
+    s2, c2 = full_adder(west, east, sw)
+    s3, c3 = s ^ se, s & se
+    bit0, c4 = full_adder(s1, s2, s3)
+    t, c5 = full_adder(c1, c2, c3)
+    bit1, c6 = t ^ c4, t & c4
+    bit2, bit3 = c5 ^ c6, c5 & c6
+    return bit0, bit1, bit2, bit3
+
+
+def count_equals(planes, k):
+    result = None
+    for i, plane in enumerate(planes):
+        term = plane if (k >> i) & 1 else ~plane
+        result = term if result is None else result & term
+    return result
+
+
+def step_life(words, width, boundary):
+    # camino rápido B3/S23: vive si el conteo es 3, o si es 2 y ya estaba viva
+    bit0, bit1, bit2, _ = neighbor_planes(words, width, boundary)
+    new = bit1 & ~bit2 & (bit0 | words)
+    new[:, -1] &= last_word_mask(width)
+    return new
+
+
+def step_words(words, width, rule, boundary):
+    if not rule.totalistic:
+        raise ValueError("bitlife sólo admite reglas totalistas B/S")
+    if rule.is_life():
+        return step_life(words, width, boundary)
+    planes = neighbor_planes(words, width, boundary)
+    born = np.zeros_like(words)
+    stays = np.zeros_like(words)
+    for k in rule.birth:
+        born |= count_equals(planes, k)
+    for k in rule.survive:
+        stays |= count_equals(planes, k)
+    new = (words & stays) | (~words & born)
+    new[:, -1] &= last_word_mask(width)
+    return new
+
+
+def adjust_grid_bits(pos_set, rule, boundary, width, height):
+    words = positions_to_words(pos_set, width, height)
+    return words_to_positions(step_words(words, width, rule, boundary), width)
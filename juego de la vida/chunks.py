@@ -0,0 +1,187 @@
+import numpy as np
+
+import dense
+
+# Plano ilimitado por trozos: las células vivas se guardan en bloques de
+# CHUNK x CHUNK indexados por una clave de 64 bits que empaqueta las
+# coordenadas (cx, cy) del bloque como enteros con signo de 32 bits. Sólo
+# existen los bloques con alguna célula viva, así la memoria depende del área
+# viva y no de la caja que la contiene. En cada paso se arman los bloques
+# candidatos con su halo de una célula y se avanzan juntos con
+# dense.step_padded; los que quedan vacíos se liberan. El resultado es un
+# ChunkMap nuevo: la simulación lo guarda como tablero entre pasos.
+
+CHUNK = 64
+SHIFT = 6  # log2(CHUNK)
+MASK32 = (1 << 32) - 1
+
+
+def chunk_key(cx, cy):
+    return ((cy & MASK32) << 32) | (cx & MASK32)
+
+
+def chunk_coords(key):
+    cx, cy = key & MASK32, key >> 32
+    if cx >> 31:
+        cx -= 1 << 32
+    if cy >> 31:
+        cy -= 1 << 32
+    return cx, cy
+
+
+# vecinos de un bloque: (dx, dy) -> qué borde del bloque tiene que estar vivo
+# para que el vecino pueda recibir nacimientos
+EDGES = {
+    (-1, -1): (0, 0), (0, -1): (0, slice(None)), (1, -1): (0, -1),
+    (-1, 0): (slice(None), 0), (1, 0): (slice(None), -1),
+    (-1, 1): (-1, 0), (0, 1): (-1, slice(None)), (1, 1): (-1, -1),
+}
+
+
+class ChunkMap:
+    # foto del plano: clave -> bloque uint8 (CHUNK, CHUNK) [fila, columna].
+    # Ni el dict ni los bloques se modifican después de armarla (cada paso y
+    # cada edición arman otra), así que se puede dibujar desde otro hilo
+    # mientras la simulación sigue, como hashlife.Pattern.
+    __slots__ = ("chunks", "_population")
+
+    def __init__(self, chunks=None, population=None):
+        self.chunks = {} if chunks is None else chunks
+        self._population = population
+
+    @classmethod
+    def from_cells(cls, cells):
+        # `cells`: arreglo (N, 2) de (columna, fila)
+        if not len(cells):
+            return cls({}, 0)
+        cols, rows = cells[:, 0], cells[:, 1]
+        pairs, inverse = np.unique(np.stack([cols >> SHIFT, rows >> SHIFT], axis=1), axis=0, return_inverse=True)
+        grids = np.zeros((len(pairs), CHUNK, CHUNK), dtype=np.uint8)
+        grids[inverse.ravel(), rows & (CHUNK - 1), cols & (CHUNK - 1)] = 1
+        chunks = {chunk_key(cx, cy): grid for (cx, cy), grid in zip(pairs.tolist(), grids)}
+        return cls(chunks, int(np.count_nonzero(grids)))
+
+    @property
+    def population(self):
+        if self._population is None:
+            self._population = sum(int(np.count_nonzero(grid)) for grid in self.chunks.values())
+        return self._population
+
+    @property
+    def nbytes(self):
+        return len(self.chunks) * CHUNK * CHUNK
+
+    def cells(self):
+        # células vivas (N, 2) de (columna, fila)
+        if not self.chunks:
+            return np.empty((0, 2), dtype=np.int64)
+        origins = np.array([chunk_coords(key) for key in self.chunks], dtype=np.int64) << SHIFT
+        i, rows, cols = np.nonzero(np.stack(list(self.chunks.values())))
+        return np.column_stack((cols + origins[i, 0], rows + origins[i, 1]))
+
+    def to_positions(self):
+        return set(map(tuple, self.cells().tolist()))
+
+    def window(self, col0, row0, cols, rows):
+        # células uint8 [fila, columna] del rectángulo; sólo se copian los
+        # bloques que lo tocan
+        view = np.zeros((rows, cols), dtype=np.uint8)
+        cx0, cx1 = col0 >> SHIFT, (col0 + cols - 1) >> SHIFT
+        cy0, cy1 = row0 >> SHIFT, (row0 + rows - 1) >> SHIFT
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) <= len(self.chunks):
+            keys = (chunk_key(cx, cy) for cy in range(cy0, cy1 + 1) for cx in range(cx0, cx1 + 1))
+            found = ((key, self.chunks.get(key)) for key in keys)
+        else:
+            # ventana más grande que el patrón: se recorren los bloques
+            found = self.chunks.items()
+        for key, grid in found:
+            if grid is None:
+                continue
+            cx, cy = chunk_coords(key)
+            x, y = cx << SHIFT, cy << SHIFT
+            c0, r0 = max(x, col0), max(y, row0)
+            c1, r1 = min(x + CHUNK, col0 + cols), min(y + CHUNK, row0 + rows)
+            if c0 < c1 and r0 < r1:
+                view[r0 - row0:r1 - row0, c0 - col0:c1 - col0] = grid[r0 - y:r1 - y, c0 - x:c1 - x]
+        return view
+
+    def __contains__(self, cell):
+        col, row = cell
+        grid = self.chunks.get(chunk_key(col >> SHIFT, row >> SHIFT))
+        return grid is not None and bool(grid[row & (CHUNK - 1), col & (CHUNK - 1)])
+
+    def get(self, cols, rows):
+        # estado de células sueltas (arreglos de columnas y filas)
+        return np.fromiter((cell in self for cell in zip(cols.tolist(), rows.tolist())),
+                           dtype=np.uint8, count=len(cols))
+
+    def toggled(self, cell):
+        # otra foto con `cell` invertida; sólo se copia su bloque
+        col, row = cell
+        key = chunk_key(col >> SHIFT, row >> SHIFT)
+        chunks = dict(self.chunks)
+        grid = chunks[key].copy() if key in chunks else np.zeros((CHUNK, CHUNK), dtype=np.uint8)
+        grid[row & (CHUNK - 1), col & (CHUNK - 1)] ^= 1
+        if grid.any():
+            chunks[key] = grid
+        else:
+            del chunks[key]
+        return ChunkMap(chunks)
+
+
+def candidates(board):
+    # bloques vivos más los vecinos a los que toca un borde vivo
+    keys = set(board.chunks)
+    for key, grid in board.chunks.items():
+        cx, cy = chunk_coords(key)
+        for (dx, dy), edge in EDGES.items():
+            if grid[edge].any():
+                keys.add(chunk_key(cx + dx, cy + dy))
+    return list(keys)
+
+
+def step(board, rule):
+    # un paso del ChunkMap; devuelve uno nuevo
+    if not board.chunks:
+        return board
+    keys = candidates(board)
+    # todos los bloques vivos apilados, con un bloque vacío al final
+    index = {key: i for i, key in enumerate(board.chunks)}
+    empty = len(index)
+    stack = np.zeros((empty + 1, CHUNK, CHUNK), dtype=np.uint8)
+    stack[:empty] = np.stack(list(board.chunks.values()))
+    coords = [chunk_coords(key) for key in keys]
+    near = np.array([[[index.get(chunk_key(cx + dx, cy + dy), empty)
+                       for dx in (-1, 0, 1)] for dy in (-1, 0, 1)]
+                     for cx, cy in coords])
+    padded = np.empty((len(keys), CHUNK + 2, CHUNK + 2), dtype=np.uint8)
+    padded[:, 1:-1, 1:-1] = stack[near[:, 1, 1]]
+    padded[:, 0, 1:-1] = stack[near[:, 0, 1], -1, :]
+    padded[:, -1, 1:-1] = stack[near[:, 2, 1], 0, :]
+    padded[:, 1:-1, 0] = stack[near[:, 1, 0], :, -1]
+    padded[:, 1:-1, -1] = stack[near[:, 1, 2], :, 0]
+    padded[:, 0, 0] = stack[near[:, 0, 0], -1, -1]
+    padded[:, 0, -1] = stack[near[:, 0, 2], -1, 0]
+    padded[:, -1, 0] = stack[near[:, 2, 0], 0, -1]
+    padded[:, -1, -1] = stack[near[:, 2, 2], 0, 0]
+    result = dense.step_padded(padded, rule)
+    # los bloques que quedan vacíos se liberan
+    counts = np.count_nonzero(result.reshape(len(keys), -1), axis=1)
+    alive = np.flatnonzero(counts)
+    kept = result[alive]
+    return ChunkMap({keys[i]: grid for i, grid in zip(alive.tolist(), kept)}, int(counts.sum()))
+
+
+def diff(old, new):
+    # células (N, 2) que cambiaron entre dos fotos y si están vivas en `new`
+    keys = [key for key in old.chunks.keys() | new.chunks.keys()
+            if old.chunks.get(key) is not new.chunks.get(key)]
+    if not keys:
+        return np.empty((0, 2), dtype=np.int64), np.empty(0, dtype=bool)
+    zero = np.zeros((CHUNK, CHUNK), dtype=np.uint8)
+    before = np.stack([old.chunks.get(key, zero) for key in keys])
+    after = np.stack([new.chunks.get(key, zero) for key in keys])
+    i, rows, cols = np.nonzero(before != after)
+    origins = np.array([chunk_coords(key) for key in keys], dtype=np.int64) << SHIFT
+    cells = np.column_stack((cols + origins[i, 0], rows + origins[i, 1]))
+    return cells, after[i, rows, cols] == 1
@@ -0,0 +1,75 @@
+import numpy as np
+
+# Motor denso: el tablero se guarda como arreglo de NumPy indexado [fila, columna]
+# y los vecinos se cuentan con sumas de desplazamientos sobre todo el arreglo.
+
+
+def positions_to_grid(pos_set, width, height):
+    grid = np.zeros((height, width), dtype=np.uint8)
+    if pos_set:
+        cells = np.array(list(pos_set), dtype=np.int64).reshape(-1, 2)
+        cols, rows = cells[:, 0], cells[:, 1]
+        inside = (cols >= 0) & (cols < width) & (rows >= 0) & (rows < height)
+        grid[rows[inside], cols[inside]] = 1
+    return grid
+
+
+def grid_to_positions(grid):
+    rows, cols = np.nonzero(grid)
+    return set(zip(cols.tolist(), rows.tolist()))
+
+
+def pad_grid(grid, boundary):
+    # "toro" envuelve los bordes, "nula" los rellena con células muertas;
+    # sólo se rellenan los dos últimos ejes para admitir lotes (N, H, W)
+    mode = "wrap" if boundary == "toro" else "constant"
+    pad_width = [(0, 0)] * (grid.ndim - 2) + [(1, 1), (1, 1)]
+    return np.pad(grid, pad_width, mode=mode)
+
+
+def count_padded(padded):
+    # suma separable: primero las tres filas, después las tres columnas
+    rows = padded[..., :-2, :] + padded[..., 1:-1, :] + padded[..., 2:, :]
+    counts = rows[..., :-2] + rows[..., 1:-1] + rows[..., 2:]
+    counts -= padded[..., 1:-1, 1:-1]
+    return counts
+
+
+def count_neighbors(grid, boundary):
+    return count_padded(pad_grid(grid, boundary))
+
+
+def index_padded(padded):
+    # índice de 9 bits de la vecindad 3x3 de cada célula (bit 4 = la célula)
+    padded = padded.astype(np.uint16)
+    height, width = padded.shape[-2] - 2, padded.shape[-1] - 2
+    index = np.zeros(padded.shape[:-2] + (height, width), dtype=np.uint16)
+    bit = 0
+    for dr in range(3):
+        for dc in range(3):
+            index |= padded[..., dr:dr + height, dc:dc + width] << bit
+            bit += 1
+    return index
+
+
+def neighborhood_index(grid, boundary):
+    return index_padded(pad_grid(grid, boundary))
+
+
+def step_padded(padded, rule):
+    # siguiente estado del interior de un bloque que ya trae su marco de vecinos
+    if not rule.totalistic:
+        return rule.table512[index_padded(padded)]
+    return rule.table[count_padded(padded), padded[..., 1:-1, 1:-1]]
+
+
+def step_grid(grid, rule, boundary, neighborhood=None):
+    # sin vecindad (o con la de Moore) se usa la suma separable 3x3
+    if neighborhood is not None and not neighborhood.moore:
+        return neighborhood.step(grid, rule, boundary)
+    return step_padded(pad_grid(grid, boundary), rule)
+
+
+def adjust_grid_dense(pos_set, rule, boundary, width, height, neighborhood=None):
+    grid = positions_to_grid(pos_set, width, height)
+    return grid_to_positions(step_grid(grid, rule, boundary, neighborhood))
@@ -0,0 +1,83 @@
+from functools import lru_cache
+
+import numpy as np
+
+import dense
+import rules
+
+# Reglas "Generations" (B/S/C): las células que no sobreviven pasan por C-2
+# estados refractarios antes de morir y, mientras tanto, ni cuentan como
+# vecinas ni pueden renacer. Ej. Brian's Brain B2/S/C3, Star Wars B2/S345/C4.
+# Los estados se guardan en uint8 (0 muerta, 1 viva, 2..C-1 muriendo) y el
+# paso es un solo acceso a la tabla table[vecinas vivas, estado].
+
+
+def is_generations(rule_str):
+    parts = rule_str.strip().upper().split("/")
+    return (len(parts) == 3 and parts[0].startswith("B") and parts[1].startswith("S")
+            and parts[2].startswith("C") and parts[2][1:].isdigit())
+
+
+class GenerationsRule:
+    def __init__(self, birth, survive, states, name=None):
+        if not 2 <= states <= 256:
+            raise ValueError("C debe estar entre 2 y 256")
+        base = rules.Rule(birth, survive)
+        self.birth, self.survive = base.birth, base.survive
+        self.states = states
+        self.name = name or f"{base.notation()}/C{states}"
+        self.table = np.zeros((9, states), dtype=np.uint8)
+        self.table[:, 0] = base.table[:, 0]
+        # la viva que no sobrevive entra al primer estado refractario
+        self.table[:, 1] = np.where(base.table[:, 1] == 1, 1, 2 % states)
+        for state in range(2, states):
+            self.table[:, state] = (state + 1) % states
+
+    def __repr__(self):
+        return f"GenerationsRule({self.name})"
+
+
+@lru_cache(maxsize=64)
+def compile_generations(rule_str):
+    b, s, c = rule_str.strip().upper().split("/")
+    return GenerationsRule(map(int, b[1:]), map(int, s[1:]), int(c[1:]), name=rule_str)
+
+
+def step_states(states, rule, boundary):
+    alive = (states == 1).view(np.uint8)
+    counts = dense.count_padded(dense.pad_grid(alive, boundary))
+    return rule.table[counts, states]
+
+
+class StateWorld:
+    # estados uint8 (0 muerta, 1 viva, 2..C-1 muriendo) que se conservan entre
+    # pasos; el set de posiciones sólo contiene las vivas. `step_rule` avanza
+    # un arreglo de estados: step_states aquí o ltl.step_ltl para LtL.
+    def __init__(self, width, height, rule, boundary, step_rule=step_states):
+        self.width = width
+        self.height = height
+        self.rule = rule
+        self.boundary = boundary
+        self.step_rule = step_rule
+        self.states = np.zeros((height, width), dtype=np.uint8)
+
+    def load(self, pos_set):
+        self.load_grid(dense.positions_to_grid(pos_set, self.width, self.height))
+
+    def load_grid(self, grid):
+        # arreglo nuevo: el anterior puede estar en una foto que se está dibujando
+        alive = grid.astype(bool)
+        states = self.states.copy()
+        states[(states == 1) & ~alive] = 0
+        states[alive] = 1
+        self.states = states
+
+    def step(self):
+        self.states = self.step_rule(self.states, self.rule, self.boundary)
+
+    def to_positions(self):
+        return dense.grid_to_positions(self.states == 1)
+
+    @property
+    def population(self):
+        return int((self.states == 1).sum())
@@ -0,0 +1,408 @@
+import sys
+
+import numpy as np
+
+# HashLife: el plano se guarda como un quadtree con nodos únicos (hash-consing)
+# y el resultado de avanzar cada nodo 2^j generaciones se memoriza, así que
+# los patrones repetidos en el espacio o en el tiempo se calculan una sola vez.
+# El plano es ilimitado: no hay bordes "toro" ni "nula".
+
+sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+
+
+class Node:
+    __slots__ = ("nw", "ne", "sw", "se", "level", "population")
+
+    def __init__(self, nw, ne, sw, se, level, population):
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.level = level
+        self.population = population
+
+
+DEAD = Node(None, None, None, None, 0, 0)
+ALIVE = Node(None, None, None, None, 0, 1)
+
+# los nodos de hasta BLOCK_LEVEL se dibujan como un bloque de numpy ya armado
+BLOCK_LEVEL = 4
+# hash polinomial del contenido: suma de A^col * B^fila (mod P) por célula viva
+P = (1 << 61) - 1
+A = 0x2545F4914F6CDD1D % P
+B = 0x5851F42D4C957F2D % P
+# memorias por nodo para dibujar y para el hash; los nodos no cambian, así que
+# valen para cualquier universo. Se vacían al pasar de MAX_CACHE entradas.
+MAX_CACHE = 1 << 18
+_blocks = {}
+_hashes = {}
+
+
+def remember(cache, node, value):
+    if len(cache) >= MAX_CACHE:
+        cache.clear()
+    cache[node] = value
+    return value
+
+
+def block(node):
+    # células uint8 [fila, columna] de un nodo de nivel <= BLOCK_LEVEL
+    found = _blocks.get(node)
+    if found is not None:
+        return found
+    if node.level == 0:
+        return remember(_blocks, node, np.full((1, 1), node.population, dtype=np.uint8))
+    top = np.hstack((block(node.nw), block(node.ne)))
+    bottom = np.hstack((block(node.sw), block(node.se)))
+    return remember(_blocks, node, np.vstack((top, bottom)))
+
+
+def content_hash(node):
+    # hash del nodo con su esquina en (0, 0); el vacío vale 0, así que no
+    # depende de cuánto se haya expandido la raíz
+    if node.population == 0:
+        return 0
+    if node.level == 0:
+        return 1
+    found = _hashes.get(node)
+    if found is not None:
+        return found
+    half = 1 << (node.level - 1)
+    a, b = pow(A, half, P), pow(B, half, P)
+    value = (content_hash(node.nw) + a * content_hash(node.ne)
+             + b * content_hash(node.sw) + a * b % P * content_hash(node.se)) % P
+    return remember(_hashes, node, value)
+
+
+class Pattern:
+    # foto del universo: la raíz y su esquina superior izquierda. Los nodos no
+    # se modifican, así que sirve como tablero de la simulación y se puede
+    # dibujar desde otro hilo mientras el universo sigue avanzando.
+    __slots__ = ("root", "origin")
+
+    def __init__(self, root, origin):
+        self.root = root
+        self.origin = origin
+
+    @property
+    def population(self):
+        return self.root.population
+
+    @property
+    def nbytes(self):
+        # estimado: lo que ocuparía como arreglo de células (los nodos se
+        # comparten con el universo y con las otras fotos)
+        return 8 * self.root.population
+
+    def hash(self):
+        col, row = self.origin
+        return pow(A, col, P) * pow(B, row, P) % P * content_hash(self.root) % P
+
+    def blocks(self, col0=None, row0=None, cols=None, rows=None):
+        # (nodo, col, fila) de los bloques con población que tocan el
+        # rectángulo (todo el patrón si no se da)
+        stack = [(self.root, self.origin[0], self.origin[1])]
+        while stack:
+            node, x, y = stack.pop()
+            if node.population == 0:
+                continue
+            size = 1 << node.level
+            if col0 is not None and (x >= col0 + cols or y >= row0 + rows
+                                     or x + size <= col0 or y + size <= row0):
+                continue
+            if node.level <= BLOCK_LEVEL:
+                yield node, x, y
+                continue
+            half = size >> 1
+            stack.append((node.nw, x, y))
+            stack.append((node.ne, x + half, y))
+            stack.append((node.sw, x, y + half))
+            stack.append((node.se, x + half, y + half))
+
+    def window(self, col0, row0, cols, rows):
+        # células uint8 [fila, columna] del rectángulo; sólo se recorren los
+        # nodos que lo tocan
+        view = np.zeros((rows, cols), dtype=np.uint8)
+        for node, x, y in self.blocks(col0, row0, cols, rows):
+            size = 1 << node.level
+            c0, r0 = max(x, col0), max(y, row0)
+            c1, r1 = min(x + size, col0 + cols), min(y + size, row0 + rows)
+            view[r0 - row0:r1 - row0, c0 - col0:c1 - col0] = block(node)[r0 - y:r1 - y, c0 - x:c1 - x]
+        return view
+
+    def cells(self):
+        # células vivas (N, 2) de (columna, fila)
+        found = []
+        for node, x, y in self.blocks():
+            rows, cols = np.nonzero(block(node))
+            found.append(np.column_stack((cols + x, rows + y)))
+        if not found:
+            return np.empty((0, 2), dtype=np.int64)
+        return np.concatenate(found).astype(np.int64)
+
+    def to_positions(self):
+        return set(map(tuple, self.cells().tolist()))
+
+    def __contains__(self, cell):
+        col, row = cell[0] - self.origin[0], cell[1] - self.origin[1]
+        node = self.root
+        if not (0 <= col < 1 << node.level and 0 <= row < 1 << node.level):
+            return False
+        while node.level and node.population:
+            half = 1 << (node.level - 1)
+            if row < half:
+                node = node.nw if col < half else node.ne
+            else:
+                node = node.sw if col < half else node.se
+            col, row = col % half, row % half
+        return node.population == 1
+
+    def get(self, cols, rows):
+        # estado de células sueltas (arreglos de columnas y filas)
+        return np.fromiter((cell in self for cell in zip(cols.tolist(), rows.tolist())),
+                           dtype=np.uint8, count=len(cols))
+
+
+def window_delta(old, new, col0, row0, cols, rows):
+    # (columnas, filas, +1/-1) de las células que nacen o mueren entre dos
+    # fotos en los bloques que tocan el rectángulo (pueden pasarse un poco:
+    # DensityPyramid.add recorta al tablero). Los bloques que siguen siendo
+    # el mismo nodo en el mismo lugar se saltan (los nodos son únicos); los
+    # demás se comparan todos juntos con NumPy
+    before = {(x, y): node for node, x, y in old.blocks(col0, row0, cols, rows)}
+    pairs = []  # (antes, después, x, y); None donde no hay bloque
+    for node, x, y in new.blocks(col0, row0, cols, rows):
+        previous = before.pop((x, y), None)
+        if previous is not node:
+            pairs.append((previous, node, x, y))
+    pairs.extend((node, None, x, y) for (x, y), node in before.items())
+    if not pairs:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int16)
+    size = 1 << BLOCK_LEVEL
+    empty = np.zeros((size, size), dtype=np.uint8)
+
+    def cells(node):
+        if node is None:
+            return empty
+        if node.level == BLOCK_LEVEL:
+            return block(node)
+        # una raíz más chica que un bloque se rellena hasta size x size
+        padded = empty.copy()
+        found = block(node)
+        padded[:found.shape[0], :found.shape[1]] = found
+        return padded
+
+    stacked_before = np.stack([cells(a) for a, _, _, _ in pairs])
+    stacked_after = np.stack([cells(b) for _, b, _, _ in pairs])
+    i, r, c = np.nonzero(stacked_before != stacked_after)
+    xs = np.array([x for _, _, x, _ in pairs], dtype=np.int64)
+    ys = np.array([y for _, _, _, y in pairs], dtype=np.int64)
+    return xs[i] + c, ys[i] + r, stacked_after[i, r, c].astype(np.int16) * 2 - 1
+
+
+class HashLife:
+    def __init__(self, rule, max_nodes=2000000):
+        if not rule.totalistic:
+            raise ValueError("hashlife sólo admite reglas totalistas B/S")
+        self.rule = rule
+        self.max_nodes = max_nodes
+        self.table = {}
+        self.results = {}
+        self.empty_nodes = [DEAD]
+        self.root = self.empty(3)
+        # esquina superior izquierda (columna, fila) del nodo raíz
+        self.origin = (0, 0)
+        self.generation = 0
+
+    # --- construcción de nodos ---
+
+    def join(self, nw, ne, sw, se):
+        key = (nw, ne, sw, se)
+        node = self.table.get(key)
+        if node is None:
+            population = nw.population + ne.population + sw.population + se.population
+            node = Node(nw, ne, sw, se, nw.level + 1, population)
+            self.table[key] = node
+        return node
+
+    def empty(self, level):
+        while len(self.empty_nodes) <= level:
+            e = self.empty_nodes[-1]
+            self.empty_nodes.append(self.join(e, e, e, e))
+        return self.empty_nodes[level]
+
+    def centre(self, node):
+        # nodo del doble de tamaño con `node` en el centro
+        e = self.empty(node.level - 1)
+        return self.join(
+            self.join(e, e, e, node.nw),
+            self.join(e, e, node.ne, e),
+            self.join(e, node.sw, e, e),
+            self.join(node.se, e, e, e),
+        )
+
+    def inner(self, node):
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    # --- evolución ---
+
+    def life_4x4(self, node):
+        cells = [[0] * 4 for _ in range(4)]
+        for qy, row_pair in ((0, (node.nw, node.ne)), (2, (node.sw, node.se))):
+            for qx, quad in zip((0, 2), row_pair):
+                cells[qy][qx] = quad.nw.population
+                cells[qy][qx + 1] = quad.ne.population
+                cells[qy + 1][qx] = quad.sw.population
+                cells[qy + 1][qx + 1] = quad.se.population
+        out = []
+        for y in (1, 2):
+            for x in (1, 2):
+                count = sum(cells[y + dy][x + dx]
+                            for dy in (-1, 0, 1) for dx in (-1, 0, 1)) - cells[y][x]
+                lookup = self.rule.stays if cells[y][x] else self.rule.born
+                out.append(ALIVE if lookup[count] else DEAD)
+        return self.join(*out)
+
+    def successor(self, node, j):
+        # centro (nivel k-1) de `node` avanzado 2^j generaciones, j <= k-2
+        if node.population == 0:
+            return node.nw
+        k = node.level
+        j = min(j, k - 2)
+        key = (node, j)
+        result = self.results.get(key)
+        if result is not None:
+            return result
+        if k == 2:
+            result = self.life_4x4(node)
+        else:
+            a, b, c, d = node.nw, node.ne, node.sw, node.se
+            join = self.join
+            c1 = self.successor(a, j)
+            c2 = self.successor(join(a.ne, b.nw, a.se, b.sw), j)
+            c3 = self.successor(b, j)
+            c4 = self.successor(join(a.sw, a.se, c.nw, c.ne), j)
+            c5 = self.successor(join(a.se, b.sw, c.ne, d.nw), j)
+            c6 = self.successor(join(b.sw, b.se, d.nw, d.ne), j)
+            c7 = self.successor(c, j)
+            c8 = self.successor(join(c.ne, d.nw, c.se, d.sw), j)
+            c9 = self.successor(d, j)
+            if j < k - 2:
+                result = join(
+                    join(c1.se, c2.sw, c4.ne, c5.nw),
+                    join(c2.se, c3.sw, c5.ne, c6.nw),
+                    join(c4.se, c5.sw, c7.ne, c8.nw),
+                    join(c5.se, c6.sw, c8.ne, c9.nw),
+                )
+            else:
+                result = join(
+                    self.successor(join(c1, c2, c4, c5), j),
+                    self.successor(join(c2, c3, c5, c6), j),
+                    self.successor(join(c4, c5, c7, c8), j),
+                    self.successor(join(c5, c6, c8, c9), j),
+                )
+        self.results[key] = result
+        return result
+
+    def expand(self):
+        half = 1 << (self.root.level - 1)
+        self.root = self.centre(self.root)
+        self.origin = (self.origin[0] - half, self.origin[1] - half)
+
+    def advance_pow2(self, k):
+        # la población debe quedar en la mitad central y con margen de 2^k
+        # células (velocidad de la luz) antes de calcular el sucesor
+        while self.root.level < k + 2 or self.inner(self.root).population != self.root.population:
+            self.expand()
+        self.expand()
+        quarter = 1 << (self.root.level - 2)
+        self.root = self.successor(self.root, k)
+        self.origin = (self.origin[0] + quarter, self.origin[1] + quarter)
+        self.generation += 1 << k
+        if len(self.table) > self.max_nodes:
+            self.collect()
+
+    def toggle(self, col, row):
+        # invierte una célula; la raíz crece hasta contenerla
+        while True:
+            x, y = col - self.origin[0], row - self.origin[1]
+            size = 1 << self.root.level
+            if 0 <= x < size and 0 <= y < size:
+                break
+            self.expand()
+        self.root = self.toggled(self.root, x, y)
+
+    def toggled(self, node, x, y):
+        if node.level == 0:
+            return DEAD if node.population else ALIVE
+        half = 1 << (node.level - 1)
+        quads = [node.nw, node.ne, node.sw, node.se]
+        i = (y >= half) * 2 + (x >= half)
+        quads[i] = self.toggled(quads[i], x % half, y % half)
+        return self.join(*quads)
+
+    def advance(self, generations):
+        k = 0
+        while generations:
+            if generations & 1:
+                self.advance_pow2(k)
+            generations >>= 1
+            k += 1
+
+    # --- recolección de basura ---
+
+    def collect(self):
+        # se descartan los resultados memorizados y sólo se conservan los
+        # nodos alcanzables desde la raíz
+        self.results.clear()
+        old_empty = self.empty_nodes
+        self.table = {}
+        seen = set()
+        stack = [self.root] + old_empty[1:]
+        while stack:
+            node = stack.pop()
+            if node.level == 0 or node in seen:
+                continue
+            seen.add(node)
+            self.table[(node.nw, node.ne, node.sw, node.se)] = node
+            stack.extend((node.nw, node.ne, node.sw, node.se))
+
+    # --- conversión con el set de posiciones y la foto ---
+
+    def pattern(self):
+        return Pattern(self.root, self.origin)
+
+    def load(self, pattern):
+        # los nodos pueden venir de otro universo (otra regla): se avanzan
+        # igual, sólo no se comparten con los de este
+        self.root, self.origin = pattern.root, pattern.origin
+
+    def from_positions(self, pos_set):
+        self.origin = (0, 0)
+        if not pos_set:
+            self.root = self.empty(3)
+            return
+        min_col = min(col for col, _ in pos_set)
+        min_row = min(row for _, row in pos_set)
+        max_col = max(col for col, _ in pos_set)
+        max_row = max(row for _, row in pos_set)
+        size = max(max_col - min_col, max_row - min_row) + 1
+        level = max(3, (size - 1).bit_length())
+        # se construye de abajo hacia arriba agrupando de 2x2 en 2x2
+        nodes = {(col - min_col, row - min_row): ALIVE for col, row in pos_set}
+        for lvl in range(level):
+            e = self.empty(lvl)
+            parents = {}
+            for (x, y), node in nodes.items():
+                quads = parents.setdefault((x >> 1, y >> 1), [e, e, e, e])
+                quads[(y & 1) * 2 + (x & 1)] = node
+            nodes = {pos: self.join(*quads) for pos, quads in parents.items()}
+        self.root = nodes[(0, 0)]
+        self.origin = (min_col, min_row)
+
+    def to_positions(self):
+        return self.pattern().to_positions()
+
+    @property
+    def population(self):
+        return self.root.population
@@ -0,0 +1,93 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# Presupuesto de tiempo de arranque: importa cada frontend en un intérprete
+# nuevo con `python -X importtime`, suma el tiempo acumulado del módulo y
+# revisa que no pase del presupuesto ni cargue módulos que deben importarse
+# sólo al usarse (matplotlib al graficar, tkinter en los diálogos).
+#   python import_budget.py            # todos los frontends
+#   python import_budget.py v11 --top 10
+
+# segundos de importación permitidos por frontend
+BUDGETS = {
+    "v11": 0.4,
+    "practica1": 0.4,
+    "p1": 0.25,
+    "life_run": 0.2,
+}
+# módulos que no deben cargarse al arrancar
+DEFERRED = {
+    "v11": ["matplotlib", "tkinter"],
+    "practica1": ["matplotlib", "tkinter"],
+    "p1": ["matplotlib"],
+    "life_run": ["matplotlib", "tkinter", "pygame"],
+}
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_times(module):
+    # lista de (módulo, propio en µs, acumulado en µs, profundidad) en el
+    # orden en que terminaron de importarse
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=HERE, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"no se pudo importar {module}:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            own, total, indent, name = match.groups()
+            rows.append((name, int(own), int(total), len(indent) // 2))
+    return rows
+
+
+def measure(module, repeat=3):
+    # se toma la corrida más rápida para no medir la caché de disco fría
+    best = None
+    for _ in range(repeat):
+        rows = import_times(module)
+        total = next(total for name, _, total, depth in rows if name == module and depth == 0)
+        if best is None or total < best[0]:
+            best = (total, rows)
+    return best
+
+
+def report(module, repeat=3, top=5):
+    total, rows = measure(module, repeat)
+    budget = BUDGETS.get(module)
+    loaded = {name for name, *_ in rows}
+    eager = [name for name in DEFERRED.get(module, []) if name in loaded]
+    seconds = total / 1e6
+    ok = (budget is None or seconds <= budget) and not eager
+    limit = f"{budget:.2f} s" if budget is not None else "sin presupuesto"
+    print(f"{'OK ' if ok else 'MAL'} {module}: {seconds:.3f} s (presupuesto {limit})")
+    # los imports directos del frontend que más tardan
+    start = next(i for i, row in enumerate(rows) if row[0] == module and row[3] == 0)
+    first = start
+    while first > 0 and rows[first - 1][3] > 0:
+        first -= 1
+    children = [row for row in rows[first:start] if row[3] == 1]
+    for name, _, cumulative, _ in sorted(children, key=lambda row: -row[2])[:top]:
+        print(f"      {cumulative / 1e3:8.1f} ms  {name}")
+    for name in eager:
+        print(f"      ⚠ {name} se importa al arrancar")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Revisa el tiempo de importación de los frontends.")
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5, help="imports más lentos a mostrar")
+    args = parser.parse_args(argv)
+    results = [report(module, args.repeat, args.top) for module in args.modules]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import sys
+import time
+
+import simulation
+
+# Ejecutor sin ventana: corre la simulación a toda velocidad y escribe el
+# resultado en disco.
+#   python life_run.py --rule B3/S23 --size 2000 --density 0.15 --gens 100000 --engine bits
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="life-run", description="Corre el autómata sin interfaz gráfica.")
+    parser.add_argument("--rule", default="B3/S23", help="regla B/S, Generations (B2/S/C3) o LtL")
+    parser.add_argument("--size", type=int, default=1000, help="lado del tablero")
+    parser.add_argument("--width", type=int, help="ancho (por defecto --size)")
+    parser.add_argument("--height", type=int, help="alto (por defecto --size)")
+    parser.add_argument("--density", type=float, default=0.15, help="densidad de la sopa inicial")
+    parser.add_argument("--seed", type=int, help="semilla de la sopa inicial")
+    parser.add_argument("--input", help="patrón inicial (.vida, .rle, .mc o .json) en lugar de la sopa")
+    parser.add_argument("--gens", type=int, default=1000, help="generaciones a simular")
+    parser.add_argument("--engine", choices=simulation.ENGINES,
+                        help="motor (densa por defecto; hashlife sólo con borde infinita)")
+    parser.add_argument("--boundary", default="toro", choices=simulation.BOUNDARIES)
+    parser.add_argument("--neighborhood", default=simulation.NEIGHBORHOODS[0].name,
+                        choices=[n.name for n in simulation.NEIGHBORHOODS])
+    parser.add_argument("--output", help="tablero final (.vida por defecto, .rle o .json)")
+    parser.add_argument("--compression", default="zlib", choices=["zlib", "lzma", "none"],
+                        help="compresión de la .vida de --output (none se abre con memmap)")
+    parser.add_argument("--log", help="registro de corrida (.vidalog) con una fila por generación")
+    parser.add_argument("--log-deltas", action="store_true", help="guardar también el delta de cada generación")
+    parser.add_argument("--stop-on-cycle", action="store_true", help="parar al detectar un ciclo")
+    parser.add_argument("--fast-forward", action="store_true",
+                        help="al detectar un ciclo, saltar los periodos completos que faltan")
+    parser.add_argument("--progress", type=int, default=0, metavar="N",
+                        help="informar cada N generaciones (0 = nunca)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    width = args.width or args.size
+    height = args.height or args.size
+    # sin ventana no hay retroceso; el detector de ciclos sólo si se pide
+    if args.engine and not simulation.engine_allowed(args.engine, args.boundary) and not args.input:
+        sys.exit(f"el motor {args.engine} sólo funciona con --boundary infinita")
+    try:
+        sim = simulation.Simulation(width, height, args.rule, args.boundary, "densa",
+                                    timeline=False, detect_cycles=args.stop_on_cycle or args.fast_forward)
+        sim.neighborhood = next(n for n in simulation.NEIGHBORHOODS if n.name == args.neighborhood)
+        sim.stop_on_cycle = args.stop_on_cycle
+        if args.input:
+            sim.load(args.input)
+        else:
+            sim.generate_random(args.density, args.seed)
+    except ValueError as error:
+        sys.exit(str(error))
+    if args.engine:
+        # el archivo puede traer su propio borde
+        if not simulation.engine_allowed(args.engine, sim.boundary):
+            sys.exit(f"el motor {args.engine} sólo funciona con borde infinita")
+        sim.engine = args.engine
+    if args.log:
+        sim.start_log(args.log, deltas=args.log_deltas)
+
+    def progress(sim):
+        elapsed = time.perf_counter() - started
+        print(f"gen {sim.iteration}  vivas {sim.population}  {elapsed:.1f} s", file=sys.stderr)
+
+    started = time.perf_counter()
+    start_gen = sim.iteration
+    try:
+        cycle = sim.run(args.gens, progress if args.progress else None, args.progress or 1,
+                        fast_forward=args.fast_forward)
+    finally:
+        elapsed = time.perf_counter() - started
+        sim.close()
+    done = sim.iteration - start_gen
+    # con --fast-forward `done` incluye los periodos saltados
+    print(f"generaciones: {done}  vivas: {sim.population}  tiempo: {elapsed:.2f} s  "
+          f"gen/s: {done / elapsed if elapsed else float('inf'):.1f}")
+    if cycle:
+        transient, period = cycle
+        print(f"ciclo: periodo {period}, transitorio {transient}")
+    if args.output:
+        sim.save(args.output, None if args.compression == "none" else args.compression)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import numpy as np
+
+import bitlife
+import rewind
+
+# Pirámide de densidad para alejar la vista a menos de un píxel por célula:
+# el nivel k guarda cuántas células vivas hay en cada bloque de 2^k x 2^k
+# (el nivel 0 es el tablero mismo y no se guarda). Se arma una vez desde el
+# tablero y después sólo se suman los nacimientos y se restan las muertes de
+# cada generación en todos los niveles.
+
+
+def reduce_counts(counts, dtype):
+    # suma de bloques de 2 x 2; un borde impar se rellena con ceros
+    h, w = counts.shape
+    padded = np.zeros((h + h % 2, w + w % 2), dtype=dtype)
+    padded[:h, :w] = counts
+    return padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2).sum(axis=(1, 3), dtype=dtype)
+
+
+class DensityPyramid:
+    def __init__(self, width, height, levels=None):
+        self.width = width
+        self.height = height
+        # hasta que un solo bloque cubra todo el tablero
+        self.depth = levels or max(1, (max(width, height) - 1).bit_length())
+        self.reset()
+
+    def reset(self, grid=None):
+        current = np.zeros((self.height, self.width), dtype=np.uint8) if grid is None else grid
+        self.levels = [None]
+        for k in range(1, self.depth + 1):
+            # int16 alcanza mientras 4^k < 2^15
+            current = reduce_counts(current, np.int16 if k <= 7 else np.int32)
+            self.levels.append(current)
+
+    def add(self, cols, rows, delta):
+        inside = (cols >= 0) & (cols < self.width) & (rows >= 0) & (rows < self.height)
+        rows, cols, delta = rows[inside], cols[inside], delta[inside].astype(np.int64)
+        # cada nivel junta los cambios del anterior por bloque, así los
+        # niveles altos reciben pocas sumas aunque cambien muchas células
+        for k in range(1, self.depth + 1):
+            if not len(delta):
+                return
+            level = self.levels[k]
+            flat = (rows >> 1) * level.shape[1] + (cols >> 1)
+            blocks, inverse = np.unique(flat, return_inverse=True)
+            delta = np.bincount(inverse, weights=delta).astype(np.int64)
+            keep = delta != 0
+            blocks, delta = blocks[keep], delta[keep]
+            level.ravel()[blocks] += delta.astype(level.dtype)
+            rows, cols = np.divmod(blocks, level.shape[1])
+
+    def update(self, changed, alive):
+        # `changed` = old ^ new como set; las que están en `alive` nacieron
+        if not changed:
+            return
+        cells = rewind.encode(changed)
+        delta = np.fromiter((1 if cell in alive else -1 for cell in changed), dtype=np.int16, count=len(changed))
+        self.add(cells[:, 0].astype(np.int64), cells[:, 1].astype(np.int64), delta)
+
+    def update_grid(self, old, new):
+        rows, cols = np.nonzero(old != new)
+        delta = new[rows, cols].astype(np.int16) - old[rows, cols].astype(np.int16)
+        self.add(cols, rows, delta)
+
+    def update_words(self, old, new):
+        rows, cols = bitlife.diff_cells(old, new)
+        delta = bitlife.get_cells(new, rows, cols).astype(np.int16) * 2 - 1
+        self.add(cols, rows, delta)
+
+    def view(self, level, col0, row0, cols, rows):
+        return density_view(self.levels[level], level, col0, row0, cols, rows)
+
+
+def density_view(counts, level, col0, row0, cols, rows):
+    # índices de densidad 0..255 de la ventana de `cols` x `rows` bloques
+    # del nivel `level` que empieza en la célula (col0, row0)
+    b0, a0 = col0 >> level, row0 >> level
+    view = np.zeros((rows, cols), dtype=np.uint8)
+    r0, r1 = max(a0, 0), min(a0 + rows, counts.shape[0])
+    c0, c1 = max(b0, 0), min(b0 + cols, counts.shape[1])
+    if r0 < r1 and c0 < c1:
+        region = counts[r0:r1, c0:c1]
+        view[r0 - a0:r1 - a0, c0 - b0:c1 - b0] = np.round(region * (255 / 4 ** level))
+    return view
@@ -0,0 +1,123 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Vecindades genéricas: cada vecindad se compila una sola vez a una lista de
+# desplazamientos (dr, dc) y el conteo suma una vista desplazada del tablero
+# rellenado por cada desplazamiento, sin bucles de Python por célula.
+# La hexagonal usa coordenadas desplazadas ("odd-r"): las filas impares están
+# corridas media célula a la derecha, así que tiene un juego de
+# desplazamientos para filas pares y otro para impares.
+
+
+class Neighborhood:
+    def __init__(self, mask, name="mascara", odd_mask=None):
+        mask = np.asarray(mask, dtype=bool)
+        if mask.ndim != 2 or mask.shape[0] % 2 == 0 or mask.shape[1] % 2 == 0:
+            raise ValueError("la máscara debe ser 2D con lados impares (centro en el medio)")
+        self.name = name
+        self.reach_r, self.reach_c = mask.shape[0] // 2, mask.shape[1] // 2
+        self.offsets = self.compile(mask)
+        self.odd_offsets = self.compile(odd_mask) if odd_mask is not None else None
+        self.size = len(self.offsets)
+        if self.odd_offsets is not None and len(self.odd_offsets) != self.size:
+            raise ValueError("las máscaras de filas pares e impares deben tener el mismo tamaño")
+        # la de Moore de radio 1 usa la suma separable de dense.py
+        self.moore = self.odd_offsets is None and mask.shape == (3, 3) and self.size == 8
+
+    def compile(self, mask):
+        mask = np.asarray(mask, dtype=bool).copy()
+        mask[mask.shape[0] // 2, mask.shape[1] // 2] = False
+        rows, cols = np.nonzero(mask)
+        return tuple(zip((rows - mask.shape[0] // 2).tolist(),
+                         (cols - mask.shape[1] // 2).tolist()))
+
+    def offsets_for(self, row):
+        if self.odd_offsets is not None and row % 2:
+            return self.odd_offsets
+        return self.offsets
+
+    def neighbors(self, pos):
+        # vecinos sin plegar; el borde lo resuelve quien llama
+        col, row = pos
+        return [(col + dc, row + dr) for dr, dc in self.offsets_for(row)]
+
+    def sources(self, pos):
+        # células que tienen a `pos` como vecina; con máscaras asimétricas no
+        # coinciden con neighbors(pos) y son las candidatas a nacer
+        col, row = pos
+        if self.odd_offsets is None:
+            return [(col - dc, row - dr) for dr, dc in self.offsets]
+        return [(col - dc, row - dr)
+                for parity, offsets in ((0, self.offsets), (1, self.odd_offsets))
+                for dr, dc in offsets if (row - dr) % 2 == parity]
+
+    def pad(self, grid, boundary):
+        mode = "wrap" if boundary == "toro" else "constant"
+        pad_width = [(0, 0)] * (grid.ndim - 2) + [(self.reach_r,) * 2, (self.reach_c,) * 2]
+        return np.pad(grid, pad_width, mode=mode)
+
+    def count_padded(self, padded, offsets):
+        height = padded.shape[-2] - 2 * self.reach_r
+        width = padded.shape[-1] - 2 * self.reach_c
+        dtype = np.uint8 if self.size < 256 else np.uint16
+        counts = np.zeros(padded.shape[:-2] + (height, width), dtype=dtype)
+        for dr, dc in offsets:
+            r, c = self.reach_r + dr, self.reach_c + dc
+            counts += padded[..., r:r + height, c:c + width]
+        return counts
+
+    def count(self, grid, boundary):
+        padded = self.pad(grid, boundary)
+        counts = self.count_padded(padded, self.offsets)
+        if self.odd_offsets is not None:
+            odd = self.count_padded(padded[..., 1:, :], self.odd_offsets)
+            counts[..., 1::2, :] = odd[..., 0::2, :]
+        return counts
+
+    def step(self, grid, rule, boundary):
+        if not rule.totalistic:
+            raise ValueError("las reglas no totalistas sólo admiten la vecindad de Moore")
+        return rule_table(rule, self.size)[self.count(grid, boundary), grid]
+
+    def __repr__(self):
+        return f"Neighborhood({self.name}, {self.size} vecinas)"
+
+
+@lru_cache(maxsize=64)
+def rule_table(rule, size):
+    # tabla [vecinos, estado] de la regla extendida a vecindades de más de 8
+    # células (los conteos mayores que 8 no aparecen en la notación B/S)
+    table = np.zeros((max(size, 8) + 1, 2), dtype=np.uint8)
+    table[:9] = rule.table
+    return table
+
+
+def moore(radius=1):
+    size = 2 * radius + 1
+    return Neighborhood(np.ones((size, size), dtype=bool),
+                        "moore" if radius == 1 else f"moore r{radius}")
+
+
+def von_neumann(radius=1):
+    r = np.arange(-radius, radius + 1)
+    mask = np.abs(r)[:, None] + np.abs(r)[None, :] <= radius
+    return Neighborhood(mask, "von neumann" if radius == 1 else f"von neumann r{radius}")
+
+
+def hexagonal():
+    # odd-r: las filas pares tocan las columnas c-1 y c arriba y abajo,
+    # las impares c y c+1
+    even = np.array([[1, 1, 0],
+                     [1, 0, 1],
+                     [1, 1, 0]], dtype=bool)
+    return Neighborhood(even, "hexagonal", odd_mask=even[:, ::-1])
+
+
+def from_mask(mask, name="mascara"):
+    return Neighborhood(mask, name)
+
+
+MOORE = moore()
+VON_NEUMANN = von_neumann()
+HEXAGONAL = hexagonal()
@@ -0,0 +1,189 @@
+import os
+import signal
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import dense
+
+# Motor paralelo: el tablero vive en memoria compartida con doble búfer y se
+# divide en franjas horizontales, una por proceso. En cada generación cada
+# proceso lee su franja más una fila de halo arriba y abajo (de las franjas
+# vecinas, o envuelta si el borde es "toro"), escribe su parte del búfer
+# siguiente y espera en una barrera a los demás antes de continuar.
+# El proceso principal nunca espera sin límite: si un proceso muere, step()
+# lanza RuntimeError en lugar de quedarse colgado.
+
+STOP = -1
+# segundos entre revisiones de que los procesos sigan vivos mientras avanzan
+POLL = 0.5
+# los procesos esperan la orden en la barrera; con spawn tardan en arrancar
+START_TIMEOUT = 60
+
+
+def stripe_bounds(height, workers):
+    edges = np.linspace(0, height, workers + 1).astype(int)
+    return list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+
+
+def read_stripe(src, r0, r1, boundary):
+    # franja [r0, r1) con una fila de halo arriba y otra abajo
+    height = src.shape[0]
+    if r0 > 0 and r1 < height:
+        return src[r0 - 1:r1 + 1]
+    rows = np.arange(r0 - 1, r1 + 1)
+    if boundary == "toro":
+        return src[rows % height]
+    block = np.zeros((len(rows), src.shape[1]), dtype=src.dtype)
+    inside = (rows >= 0) & (rows < height)
+    block[inside] = src[rows[inside]]
+    return block
+
+
+def step_stripe(src, dst, r0, r1, rule, boundary):
+    block = read_stripe(src, r0, r1, boundary)
+    mode = "wrap" if boundary == "toro" else "constant"
+    padded = np.pad(block, ((0, 0), (1, 1)), mode=mode)
+    dst[r0:r1] = dense.step_padded(padded, rule)
+
+
+def worker_loop(shm_name, shape, r0, r1, rule, boundary, command, start, done, generation):
+    # con fork se heredan los manejadores de SDL (pygame atrapa SIGTERM), así
+    # que se restauran para que terminate() pueda detener al proceso
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buffers = np.ndarray((2,) + shape, dtype=np.uint8, buffer=shm.buf)
+    try:
+        while True:
+            start.wait()
+            steps, current = command[0], command[1]
+            if steps == STOP:
+                break
+            for _ in range(steps):
+                step_stripe(buffers[current], buffers[1 - current], r0, r1, rule, boundary)
+                generation.wait()
+                current = 1 - current
+            done.release()
+    finally:
+        del buffers
+        shm.close()
+
+
+class ParallelLife:
+    def __init__(self, width, height, rule, boundary, workers=None):
+        self.width = width
+        self.height = height
+        self.rule = rule
+        self.boundary = boundary
+        workers = workers or os.cpu_count() or 1
+        self.workers = max(1, min(workers, height))
+        shape = (height, width)
+        self.shm = shared_memory.SharedMemory(create=True, size=2 * height * width)
+        self.buffers = np.ndarray((2,) + shape, dtype=np.uint8, buffer=self.shm.buf)
+        self.buffers[:] = 0
+        self.current = 0
+        # [generaciones a avanzar (o STOP), búfer actual]
+        self.command = mp.RawArray("q", 2)
+        self.start = mp.Barrier(self.workers + 1)
+        # cada proceso suma uno al terminar la orden
+        self.done = mp.Semaphore(0)
+        # en el objeto y no en una variable local: con spawn los procesos la
+        # abren después de que __init__ termina
+        self.generation = mp.Barrier(self.workers)
+        self.processes = []
+        for r0, r1 in stripe_bounds(height, self.workers):
+            p = mp.Process(target=worker_loop, daemon=True,
+                           args=(self.shm.name, shape, r0, r1, rule, boundary,
+                                 self.command, self.start, self.done, self.generation))
+            p.start()
+            self.processes.append(p)
+
+    @property
+    def grid(self):
+        return self.buffers[self.current]
+
+    def load(self, pos_set):
+        self.load_grid(dense.positions_to_grid(pos_set, self.width, self.height))
+
+    def load_grid(self, grid):
+        self.grid[:] = grid
+
+    def board(self):
+        # copia: los búferes compartidos se reescriben en su lugar cada dos pasos
+        return self.grid.copy()
+
+    def to_positions(self):
+        return dense.grid_to_positions(self.grid)
+
+    def step(self, generations=1):
+        if generations <= 0:
+            return
+        self.check()
+        self.command[0] = generations
+        self.command[1] = self.current
+        self.wait_start()
+        for _ in self.processes:
+            while not self.done.acquire(timeout=POLL):
+                self.check()
+        self.current = (self.current + generations) % 2
+
+    def wait_start(self):
+        try:
+            self.start.wait(START_TIMEOUT)
+        except threading.BrokenBarrierError:
+            self.check()
+            self.terminate()
+            raise RuntimeError("los procesos de franjas no respondieron") from None
+
+    def check(self):
+        # si algún proceso murió, los demás quedan esperando en la barrera
+        dead = [p for p in self.processes if not p.is_alive()]
+        if dead:
+            self.terminate()
+            raise RuntimeError(f"el proceso {dead[0].name} terminó con código {dead[0].exitcode}")
+
+    @property
+    def population(self):
+        return int(self.grid.sum())
+
+    def close(self):
+        if not self.processes:
+            return
+        if all(p.is_alive() for p in self.processes):
+            self.command[0] = STOP
+            try:
+                self.start.wait(START_TIMEOUT)
+            except threading.BrokenBarrierError:
+                pass
+            for p in self.processes:
+                p.join(START_TIMEOUT)
+        self.terminate()
+
+    def terminate(self):
+        # detiene los procesos que queden y libera la memoria compartida
+        if not self.processes:
+            return
+        for p in self.processes:
+            if p.is_alive():
+                p.terminate()
+            p.join()
+        self.processes = []
+        del self.buffers
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def adjust_grid_parallel(pos_set, world):
+    # misma interfaz de set que adjust_grid, sobre un ParallelLife ya creado
+    world.load(pos_set)
+    world.step()
+    return world.to_positions()
@@ -0,0 +1,171 @@
+import re
+
+import numpy as np
+
+import hashlife
+import rules
+
+# Formatos de patrones estándar:
+#   .rle  run-length encoding con cabecera "x = 3, y = 3, rule = B3/S23"
+#         (se lee y escribe por líneas, sin cargar el archivo completo)
+#   .mc   macrocell de Golly: los nodos del quadtree uno por línea; se cargan
+#         directo como nodos de HashLife, sin pasar por cada célula
+
+HEADER = re.compile(r"\s*x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)(?:\s*,\s*rule\s*=\s*(\S+))?", re.I)
+TOKEN = re.compile(r"(\d*)([a-zA-Z.$!])")
+LINE_LENGTH = 70
+
+
+def normalize_rule(text):
+    # Golly acepta también la forma S/B ("23/3") y S/B/C para Generations
+    text = text.strip()
+    match = re.fullmatch(r"(\d*)/(\d*)(?:/(\d+))?", text)
+    if match:
+        survive, birth, states = match.groups()
+        rule = f"B{birth}/S{survive}"
+        return rule + f"/C{states}" if states else rule
+    if text[:1] in "bB":
+        return text.upper()
+    return text
+
+
+def iter_rle(lines, info):
+    # genera (col, fila) de las células vivas; la regla y la posición de la
+    # cabecera quedan en `info`
+    info.setdefault("rule", None)
+    info.setdefault("origin", (0, 0))
+    col = row = 0
+    header_seen = False
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            pos = re.match(r"#CXRLE.*Pos\s*=\s*(-?\d+)\s*,\s*(-?\d+)", line)
+            if pos:
+                info["origin"] = (int(pos.group(1)), int(pos.group(2)))
+                col, row = info["origin"]
+            continue
+        if not header_seen:
+            header = HEADER.match(line)
+            if header:
+                header_seen = True
+                if header.group(3):
+                    info["rule"] = normalize_rule(header.group(3))
+                continue
+        for count, tag in TOKEN.findall(line):
+            n = int(count) if count else 1
+            if tag == "!":
+                return
+            if tag == "$":
+                row += n
+                col = info["origin"][0]
+            elif tag in "b.":
+                col += n
+            else:
+                # "o" viva; en RLE de varios estados sólo "A" es viva
+                if tag in "oA":
+                    for c in range(col, col + n):
+                        yield c, row
+                col += n
+
+
+def read_rle(path):
+    # devuelve (posiciones, regla o None)
+    info = {}
+    with open(path) as f:
+        positions = set(iter_rle(f, info))
+    return positions, info["rule"]
+
+
+def rle_runs(positions):
+    # tokens de la codificación, recorriendo las filas de arriba hacia abajo;
+    # los tramos de células vivas consecutivas se detectan con NumPy
+    cells = np.array(list(positions), dtype=np.int64).reshape(-1, 2)
+    cells = cells[np.lexsort((cells[:, 0], cells[:, 1]))]
+    cols, rows = cells[:, 0], cells[:, 1]
+    starts = np.flatnonzero(np.r_[True, (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1] + 1)])
+    lengths = np.diff(np.r_[starts, len(cells)])
+    run_cols, run_rows = cols[starts], rows[starts]
+    # hueco antes de cada tramo: filas saltadas y columnas muertas
+    left = cols.min()
+    row_gap = np.diff(np.r_[run_rows[0], run_rows])
+    previous_end = np.r_[left, run_cols[:-1] + lengths[:-1]]
+    previous_end[row_gap > 0] = left
+    col_gap = run_cols - previous_end
+    count = lambda n: str(n) if n > 1 else ""
+    for rg, cg, n in zip(row_gap.tolist(), col_gap.tolist(), lengths.tolist()):
+        if rg:
+            yield count(rg) + "$"
+        if cg:
+            yield count(cg) + "b"
+        yield count(n) + "o"
+    yield "!"
+
+
+def write_rle(path, positions, rule_str="B3/S23"):
+    with open(path, "w") as f:
+        if not positions:
+            f.write(f"x = 0, y = 0, rule = {rule_str}\n!\n")
+            return
+        min_col = min(col for col, _ in positions)
+        min_row = min(row for _, row in positions)
+        width = max(col for col, _ in positions) - min_col + 1
+        height = max(row for _, row in positions) - min_row + 1
+        # la posición absoluta se guarda con la extensión de Golly
+        f.write(f"#CXRLE Pos={min_col},{min_row}\n")
+        f.write(f"x = {width}, y = {height}, rule = {rule_str}\n")
+        line = ""
+        for token in rle_runs(positions):
+            if len(line) + len(token) > LINE_LENGTH:
+                f.write(line + "\n")
+                line = ""
+            line += token
+        f.write(line + "\n")
+
+
+def read_macrocell(path, universe=None, rule=None):
+    # carga un .mc de Golly en un HashLife (nuevo o dado) y devuelve
+    # (universo, regla o None); el nodo raíz queda centrado en (0, 0) como en Golly
+    rule_str = None
+    nodes = [None]  # el índice 0 es el nodo vacío del nivel que toque
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("[M2]"):
+                continue
+            if line.startswith("#"):
+                if line.startswith("#R"):
+                    rule_str = normalize_rule(line[2:])
+                continue
+            if universe is None:
+                universe = hashlife.HashLife(rule or rules.compile_rule(rule_str or "B3/S23"))
+            if line[0] in ".*$":
+                nodes.append(leaf_8x8(universe, line))
+            else:
+                level, *children = map(int, line.split())
+                quads = [nodes[i] if i else universe.empty(level - 1) for i in children]
+                nodes.append(universe.join(*quads))
+    if universe is None:
+        raise ValueError(f"{path}: macrocell vacío")
+    root = nodes[-1]
+    half = 1 << (root.level - 1)
+    universe.root = root
+    universe.origin = (-half, -half)
+    universe.generation = 0
+    return universe, rule_str
+
+
+def leaf_8x8(universe, line):
+    # nodo de nivel 3 a partir de las filas "$" con "." muertas y "*" vivas
+    grid = [[hashlife.DEAD] * 8 for _ in range(8)]
+    for y, text in enumerate(line.split("$")[:8]):
+        for x, ch in enumerate(text[:8]):
+            if ch == "*":
+                grid[y][x] = hashlife.ALIVE
+    for _ in range(3):
+        size = len(grid) // 2
+        grid = [[universe.join(grid[2 * y][2 * x], grid[2 * y][2 * x + 1],
+                               grid[2 * y + 1][2 * x], grid[2 * y + 1][2 * x + 1])
+                 for x in range(size)] for y in range(size)]
+    return grid[0][0]
@@ -5,10 +5,9 @@
 
 import pygame
 import random
-import json
 import math
-import matplotlib.pyplot as plt
-from tkinter import filedialog, Tk
+import render
+import simulation
 
 pygame.init()
 
@@ -25,110 +24,48 @@ FPS = 60
 
 GRID_WIDTH = 1000
 GRID_HEIGHT = 1000
-positions = set()
-history = []
-iteration = 0
-ruleStr = "B3/S23"
-boundary = "toro"
+sim = simulation.Simulation(GRID_WIDTH, GRID_HEIGHT, timeline=False, detect_cycles=False)
 
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 clock = pygame.time.Clock()
-
-def ParseRule(rule):
-    b, s = rule.split('/')
-    birth = list(map(int, b[1:]))
-    survive = list(map(int, s[1:]))
-    return birth, survive
-
-def GetNeighbors(pos):
-    col, row = pos
-    neighbors = []
-    for dc in [-1, 0, 1]:
-        for dr in [-1, 0, 1]:
-            if dc == 0 and dr == 0:
-                continue
-            nc, nr = col + dc, row + dr
-            if boundary == "toro":
-                nc %= GRID_WIDTH
-                nr %= GRID_HEIGHT
-            if 0 <= nc < GRID_WIDTH and 0 <= nr < GRID_HEIGHT:
-                neighbors.append((nc, nr))
-    return neighbors
-
-def AdjustGrid(posSet):
-    birth, survive = ParseRule(ruleStr)
-    newPositions = set()
-    candidates = set()
-    for p in posSet:
-        candidates.add(p)
-        candidates.update(GetNeighbors(p))
-    for cell in candidates:
-        count = sum((n in posSet) for n in GetNeighbors(cell))
-        if cell in posSet and count in survive:
-            newPositions.add(cell)
-        elif cell not in posSet and count in birth:
-            newPositions.add(cell)
-    return newPositions
+renderer = render.Renderer(screen)
 
 def DrawGrid():
-    for cell in positions:
-        col, row = cell
-        sx = (col - viewportX) * cellSize
-        sy = (row - viewportY) * cellSize
-        if 0 <= sx < WIDTH and 0 <= sy < HEIGHT:
-            pygame.draw.rect(screen, CELL_COLOR, (sx, sy, cellSize, cellSize))
+    cols, rows = render.view_shape(WIDTH, HEIGHT, cellSize)
+    palette = render.state_palette(2, CELL_COLOR, BG_COLOR)
+    renderer.draw(sim.view(viewportX, viewportY, cols, rows), cellSize, palette)
 
 def SaveConfig():
+    # tkinter y matplotlib se importan al usarse (ver import_budget.py)
+    from tkinter import filedialog, Tk
     Tk().withdraw()
-    path = filedialog.asksaveasfilename(defaultextension=".json")
+    path = filedialog.asksaveasfilename(defaultextension=".vida",
+                                        filetypes=[("Instantánea", "*.vida"), ("JSON", "*.json")])
     if path:
-        data = {
-            "positions": list(positions),
-            "rule": ruleStr,
-            "boundary": boundary
-        }
-        with open(path, 'w') as f:
-            json.dump(data, f)
+        sim.save(path)
 
 def LoadConfig():
-    global positions, ruleStr, boundary
+    from tkinter import filedialog, Tk
     Tk().withdraw()
     path = filedialog.askopenfilename()
     if path:
-        with open(path) as f:
-            data = json.load(f)
-            positions.clear()
-            positions.update(map(tuple, data["positions"]))
-            ruleStr = data.get("rule", "B3/S23")
-            boundary = data.get("boundary", "toro")
+        sim.load(path)
 
 def PlotDensity():
-    if not history:
+    if not sim.history:
         return
+    import matplotlib.pyplot as plt
     plt.figure("Densidad")
-    plt.plot(history, label="Normal")
+    plt.plot(sim.history, label="Normal")
     plt.legend()
     plt.figure("Log10")
-    logHistory = [math.log10(x) if x > 0 else 0 for x in history]
+    logHistory = [math.log10(x) if x > 0 else 0 for x in sim.history]
     plt.plot(logHistory, label="Log10")
     plt.legend()
     plt.show()
 
-def GenerateClusteredCells(numClusters=15, cellsPerCluster=2000, clusterRadius=30):
-    positions.clear()
-    for _ in range(numClusters):
-        centerCol = random.randint(100, GRID_WIDTH - 100)
-        centerRow = random.randint(100, GRID_HEIGHT - 100)
-        for _ in range(cellsPerCluster):
-            dx = random.randint(-clusterRadius, clusterRadius)
-            dy = random.randint(-clusterRadius, clusterRadius)
-            col = (centerCol + dx) % GRID_WIDTH
-            row = (centerRow + dy) % GRID_HEIGHT
-            positions.add((col, row))
-
 def main():
-    global positions, cellSize, viewportX, viewportY, CELL_COLOR, BG_COLOR
-    global iteration, boundary, ruleStr
+    global cellSize, viewportX, viewportY, CELL_COLOR, BG_COLOR
 
     running = True
     playing = False
@@ -139,7 +76,7 @@ def main():
     while running:
         screen.fill(BG_COLOR)
         DrawGrid()
-        pygame.display.set_caption(f"Iter: {iteration}  Vivas: {len(positions)}  Rule: {ruleStr}  Boundary: {boundary}")
+        pygame.display.set_caption(f"Iter: {sim.iteration}  Vivas: {sim.population}  Rule: {sim.rule_str}  Boundary: {sim.boundary}  Motor: {sim.engine}")
         pygame.display.update()
 
         # Obtener el estado de todas las teclas
@@ -154,11 +91,7 @@ def main():
                     mx, my = pygame.mouse.get_pos()
                     col = mx // cellSize + viewportX
                     row = my // cellSize + viewportY
-                    pos = (col, row)
-                    if pos in positions:
-                        positions.remove(pos)
-                    else:
-                        positions.add(pos)
+                    sim.toggle((col, row))
                 elif event.button == 4:
                     cellSize = min(10, cellSize + 1)
                 elif event.button == 5:
@@ -166,7 +99,7 @@ def main():
 
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
-                    if len(positions) == 0:
+                    if sim.population == 0:
                         print("⚠ No hay celulas vivas. Presiona G para generar o dibuja una.")
                     else:
                         playing = not playing
@@ -175,9 +108,7 @@ def main():
                     stepMode = True
 
                 elif event.key == pygame.K_c:
-                    positions.clear()
-                    iteration = 0
-                    history.clear()
+                    sim.clear()
 
                 elif event.key == pygame.K_s:
                     SaveConfig()
@@ -189,10 +120,17 @@ def main():
                     PlotDensity()
 
                 elif event.key == pygame.K_r:
-                    ruleStr = input("Regla B/S: (ej: B3/S23) ")
+                    try:
+                        sim.set_rule(input("Regla B/S: (ej: B3/S23) "))
+                    except ValueError as error:
+                        print(f"⚠ {error}")
 
                 elif event.key == pygame.K_b:
-                    boundary = "nula" if boundary == "toro" else "toro"
+                    sim.set_boundary("nula" if sim.boundary == "toro" else "toro")
+
+                elif event.key == pygame.K_e:
+                    sim.engine = "dispersa" if sim.engine == "densa" else "densa"
+                    print(f"Motor: {sim.engine}")
 
                 elif event.key == pygame.K_z:
                     cellSize = max(1, cellSize - 1)
@@ -206,9 +144,7 @@ def main():
                     BG_COLOR = tuple(random.randint(0, 150) for _ in range(3))
 
                 elif event.key == pygame.K_g:
-                    GenerateClusteredCells()
-                    iteration = 0
-                    history.clear()
+                    sim.generate_clustered()
                     viewportX = GRID_WIDTH // 2 - WIDTH // (2 * cellSize)
                     viewportY = GRID_HEIGHT // 2 - HEIGHT // (2 * cellSize)
 
@@ -223,13 +159,10 @@ def main():
             viewportX = min(GRID_WIDTH - WIDTH // cellSize, viewportX + 10)
 
         if (playing and frameCounter >= delayBetweenSteps) or stepMode:
-            positionsNew = AdjustGrid(positions)
-            if not positionsNew:
+            sim.step()
+            if sim.population == 0:
                 playing = False
                 print("Todas las celulas han muerto")
-            positions = positionsNew
-            history.append(len(positions))
-            iteration += 1
             frameCounter = 0
             stepMode = False
         else:
@@ -0,0 +1,76 @@
+from functools import lru_cache
+
+import numpy as np
+import pygame
+
+# Dibujo de la vista en una sola llamada: los estados de las células
+# visibles (uint8, [fila, columna]) o, en la vista alejada, los índices de
+# densidad de cada bloque se copian a una superficie indexada de 8 bits con
+# su paleta, se escala por cell_size con pygame.transform.scale y se hace un
+# solo blit. El costo depende del tamaño de la vista, no de la población.
+
+
+class Renderer:
+    def __init__(self, screen):
+        self.screen = screen
+        self.surface = None  # superficie indexada del tamaño de la vista
+        self.palette_key = None
+
+    def indexed_surface(self, cols, rows, palette):
+        if self.surface is None or self.surface.get_size() != (cols, rows):
+            self.surface = pygame.Surface((cols, rows), depth=8)
+            self.palette_key = None
+        key = palette.tobytes()
+        if key != self.palette_key:
+            colors = [tuple(color) for color in palette.tolist()]
+            self.surface.set_palette(colors + [colors[0]] * (256 - len(colors)))
+            self.palette_key = key
+        return self.surface
+
+    def draw(self, view, cell_size, palette):
+        # `view` cubre la pantalla desde su esquina superior izquierda
+        rows, cols = view.shape
+        if view.size == 0:
+            return
+        surface = self.indexed_surface(cols, rows, palette)
+        pygame.surfarray.blit_array(surface, view.T)
+        scaled = pygame.transform.scale(surface, (cols * cell_size, rows * cell_size))
+        self.screen.blit(scaled, (0, 0))
+
+    def draw_cells(self, cols, rows, states, cell_size, palette):
+        # repinta sólo las células dadas (relativas a la vista) y devuelve
+        # los rectángulos para pygame.display.update
+        colors = [tuple(color) for color in palette.tolist()]
+        rects = []
+        for col, row, state in zip(cols.tolist(), rows.tolist(), states.tolist()):
+            rect = pygame.Rect(col * cell_size, row * cell_size, cell_size, cell_size)
+            self.screen.fill(colors[state], rect)
+            rects.append(rect)
+        return rects
+
+
+def view_shape(width, height, cell_size):
+    # columnas y filas visibles, contando la parcial del borde
+    return -(-width // cell_size), -(-height // cell_size)
+
+
+@lru_cache(maxsize=8)
+def density_palette(cell_color, bg_color):
+    # 256 tonos del fondo (bloque vacío) al color de célula (bloque lleno)
+    t = np.linspace(0, 1, 256)[:, None]
+    cell, bg = np.array(cell_color, dtype=float), np.array(bg_color, dtype=float)
+    return np.round(bg + (cell - bg) * t).astype(np.uint8)
+
+
+@lru_cache(maxsize=16)
+def state_palette(states, cell_color, bg_color):
+    # 0 fondo, 1 color de célula y los refractarios se desvanecen hacia el
+    # fondo; con states=2 es la paleta de dos colores
+    palette = np.zeros((max(states, 2), 3), dtype=np.uint8)
+    cell, bg = np.array(cell_color, dtype=float), np.array(bg_color, dtype=float)
+    palette[0] = bg
+    palette[1] = cell
+    for state in range(2, states):
+        t = (state - 1) / (states - 1)
+        palette[state] = np.round(cell + (bg - cell) * t)
+    return palette
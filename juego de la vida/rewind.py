@@ -0,0 +1,137 @@
+from bisect import bisect_right
+from collections import deque
+from itertools import chain
+
+import numpy as np
+
+# Historial para retroceder: cada generación se guarda como el delta de
+# células que cambiaron (nacimientos y muertes juntos, se aplican con XOR) y
+# cada `keyframe_interval` generaciones se guarda el tablero completo. Así ir
+# a cualquier generación cuesta a lo sumo un keyframe más interval deltas.
+# Con un presupuesto de memoria se descartan los segmentos más viejos.
+# Las células se guardan como arreglos (N, 2) de (columna, fila); los
+# tableros nativos los pasan directo sin armar sets de posiciones. Un
+# keyframe que no es de células (la foto del quadtree de hashlife) se guarda
+# tal cual y empieza siempre un segmento propio.
+
+
+def encode(cells):
+    # int64: en el plano "infinita" las coordenadas pueden pasar de 2^31
+    if isinstance(cells, np.ndarray):
+        return cells.astype(np.int64, copy=False).reshape(-1, 2)
+    if not cells:
+        return np.empty((0, 2), dtype=np.int64)
+    flat = np.fromiter(chain.from_iterable(cells), dtype=np.int64, count=2 * len(cells))
+    return flat.reshape(-1, 2)
+
+
+def decode(array):
+    return set(map(tuple, array.tolist()))
+
+
+def xor_cells(arrays):
+    # el XOR de varios arreglos de células: quedan las que aparecen un número
+    # impar de veces
+    cells = encode(np.concatenate([encode(array) for array in arrays]))
+    if not len(cells):
+        return cells
+    low, high = cells.min(), cells.max()
+    if -2 ** 31 <= low and high < 2 ** 31:
+        # caso común: (fila, columna) caben juntas en una clave de 64 bits
+        keys, counts = np.unique((cells[:, 1] << 32) | (cells[:, 0] & 0xFFFFFFFF), return_counts=True)
+        keys = keys[counts % 2 == 1]
+        cols = (keys & 0xFFFFFFFF).astype(np.uint32).view(np.int32).astype(np.int64)
+        return np.column_stack((cols, keys >> 32))
+    # coordenadas grandes: se ordena por (fila, columna) y se cuentan las corridas
+    cells = cells[np.lexsort((cells[:, 0], cells[:, 1]))]
+    starts = np.flatnonzero(np.concatenate(([True], (cells[1:] != cells[:-1]).any(axis=1))))
+    counts = np.diff(np.append(starts, len(cells)))
+    return cells[starts[counts % 2 == 1]]
+
+
+class Segment:
+    # un keyframe y los deltas que lo siguen
+    __slots__ = ("generations", "keyframe", "deltas", "nbytes")
+
+    def __init__(self, generation, keyframe):
+        self.generations = [generation]  # generations[i + 1] <- deltas[i]
+        self.keyframe = keyframe
+        self.deltas = []
+        self.nbytes = keyframe.nbytes
+
+
+class Timeline:
+    def __init__(self, keyframe_interval=64, budget=64 * 2 ** 20):
+        self.keyframe_interval = keyframe_interval
+        self.budget = budget
+        self.segments = deque()
+        self.nbytes = 0
+
+    def record(self, generation, keyframe, changed=None):
+        # `keyframe()` devuelve el tablero completo y sólo se llama al empezar
+        # un segmento; `changed` son las células que cambiaron desde la
+        # generación anterior (sin él se guarda un keyframe).
+        # Lo grabado desde `generation` en adelante se descarta (otra rama).
+        self.truncate(generation)
+        last = self.segments[-1] if self.segments else None
+        if (changed is None or last is None or len(last.deltas) + 1 >= self.keyframe_interval
+                or not isinstance(last.keyframe, np.ndarray)):
+            board = keyframe()
+            if isinstance(board, (set, frozenset, np.ndarray)):
+                board = encode(board)
+            segment = Segment(generation, board)
+            self.segments.append(segment)
+            self.nbytes += segment.nbytes
+        else:
+            delta = encode(changed)
+            last.generations.append(generation)
+            last.deltas.append(delta)
+            last.nbytes += delta.nbytes
+            self.nbytes += delta.nbytes
+        self.evict()
+
+    def evict(self):
+        # siempre queda al menos el segmento más reciente
+        while self.nbytes > self.budget and len(self.segments) > 1:
+            self.nbytes -= self.segments.popleft().nbytes
+
+    def truncate(self, generation):
+        while self.segments and self.segments[-1].generations[0] >= generation:
+            self.nbytes -= self.segments.pop().nbytes
+        if self.segments:
+            segment = self.segments[-1]
+            keep = bisect_right(segment.generations, generation - 1)
+            for delta in segment.deltas[keep - 1:]:
+                segment.nbytes -= delta.nbytes
+                self.nbytes -= delta.nbytes
+            del segment.generations[keep:]
+            del segment.deltas[keep - 1:]
+
+    @property
+    def first(self):
+        return self.segments[0].generations[0] if self.segments else None
+
+    @property
+    def last(self):
+        return self.segments[-1].generations[-1] if self.segments else None
+
+    def previous(self, generation):
+        # generación grabada más reciente anterior a `generation`
+        for segment in reversed(self.segments):
+            i = bisect_right(segment.generations, generation - 1)
+            if i:
+                return segment.generations[i - 1]
+        return None
+
+    def seek(self, generation):
+        # devuelve (generación, células (N, 2) o keyframe tal cual) de la
+        # última grabada <= generation
+        starts = [segment.generations[0] for segment in self.segments]
+        s = bisect_right(starts, generation) - 1
+        if s < 0:
+            return None
+        segment = self.segments[s]
+        i = bisect_right(segment.generations, generation) - 1
+        if not i:
+            return segment.generations[0], segment.keyframe
+        return segment.generations[i], xor_cells([segment.keyframe] + segment.deltas[:i])
@@ -0,0 +1,58 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Reglas precompiladas: la cadena B/S se interpreta una sola vez y se convierte
+# en tablas de consulta que usan todos los motores.
+#   table[vecinos, estado] -> estado siguiente (9 x 2)
+#   table512[vecindad 3x3] -> estado siguiente, con el bit 4 como célula central
+#   born[vecinos] / stays[vecinos] -> tuplas para los motores en Python puro
+
+
+def parse_rule(rule):
+    b, s = rule.split('/')
+    birth = list(map(int, b[1:]))
+    survive = list(map(int, s[1:]))
+    return birth, survive
+
+
+class Rule:
+    def __init__(self, birth, survive, name=None, table512=None):
+        # igual que el adjust_grid original, B0 no hace nacer células lejos de
+        # las vivas: sólo se revisan las vecinas de alguna célula viva
+        self.birth = frozenset(n for n in birth if 0 < n <= 8)
+        self.survive = frozenset(n for n in survive if 0 <= n <= 8)
+        self.totalistic = table512 is None
+        self.name = name or self.notation()
+        self.table = np.zeros((9, 2), dtype=np.uint8)
+        self.table[sorted(self.birth), 0] = 1
+        self.table[sorted(self.survive), 1] = 1
+        self.born = tuple(bool(x) for x in self.table[:, 0])
+        self.stays = tuple(bool(x) for x in self.table[:, 1])
+        if table512 is None:
+            index = np.arange(512)
+            center = (index >> 4) & 1
+            count = np.array([bin(i).count("1") for i in range(512)]) - center
+            table512 = self.table[count, center]
+        self.table512 = np.asarray(table512, dtype=np.uint8).copy()
+        self.table512[0] = 0
+
+    @classmethod
+    def from_table(cls, table512, name="tabla"):
+        # regla no totalista dada por su tabla completa de 512 vecindades
+        return cls((), (), name=name, table512=table512)
+
+    def notation(self):
+        return "B" + "".join(map(str, sorted(self.birth))) + "/S" + "".join(map(str, sorted(self.survive)))
+
+    def is_life(self):
+        return self.totalistic and self.birth == {3} and self.survive == {2, 3}
+
+    def __repr__(self):
+        return f"Rule({self.name})"
+
+
+@lru_cache(maxsize=64)
+def compile_rule(rule_str):
+    birth, survive = parse_rule(rule_str)
+    return Rule(birth, survive, name=rule_str)
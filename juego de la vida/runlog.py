@@ -0,0 +1,130 @@
+import json
+import struct
+import zlib
+
+import numpy as np
+
+import rewind
+
+# Registro de corrida de sólo anexado: un registro de tamaño fijo por
+# generación en `path` (se lee de vuelta como arreglo estructurado de NumPy
+# con np.memmap, sin cargar todo) y, opcionalmente, el delta de cada
+# generación comprimido con zlib en `path + ".deltas"` (células int64; los
+# registros viejos sin "delta_dtype" en la cabecera las guardaban en int32).
+# Los registros se juntan en un búfer y se escriben por bloques.
+#   MAGIC | longitud de la cabecera (uint32) | cabecera JSON | registros...
+
+MAGIC = b"VIDALOG1"
+RECORD = np.dtype([
+    ("iteration", "<i8"), ("population", "<i8"), ("births", "<i8"), ("deaths", "<i8"),
+    ("min_col", "<i8"), ("min_row", "<i8"), ("max_col", "<i8"), ("max_row", "<i8"),
+    ("step_time", "<f8"),
+    ("delta_offset", "<i8"),  # posición del delta en el archivo .deltas, -1 si no hay
+])
+NO_BOX = (0, 0, -1, -1)
+DELTA_DTYPE = "<i8"
+OLD_DELTA_DTYPE = "<i4"
+
+
+def bbox_of_grid(grid):
+    rows = np.flatnonzero(grid.any(axis=1))
+    if not len(rows):
+        return NO_BOX
+    cols = np.flatnonzero(grid.any(axis=0))
+    return int(cols[0]), int(rows[0]), int(cols[-1]), int(rows[-1])
+
+
+def bbox_of_cells(cells):
+    if not len(cells):
+        return NO_BOX
+    flat = rewind.encode(cells)
+    low, high = flat.min(axis=0), flat.max(axis=0)
+    return int(low[0]), int(low[1]), int(high[0]), int(high[1])
+
+
+class RunLog:
+    def __init__(self, path, rule="B3/S23", boundary="toro", deltas=False, buffer_records=4096):
+        self.path = path
+        self.buffer = np.zeros(buffer_records, dtype=RECORD)
+        self.count = 0
+        header = {"rule": rule, "boundary": boundary, "deltas": deltas, "delta_dtype": DELTA_DTYPE}
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            raw = json.dumps(header).encode()
+            self.file.write(MAGIC + struct.pack("<I", len(raw)) + raw)
+        else:
+            # se sigue anexando con el formato que ya tiene el archivo
+            header = read_header(path)[0]
+        self.delta_dtype = np.dtype(header.get("delta_dtype", OLD_DELTA_DTYPE))
+        self.delta_file = open(path + ".deltas", "ab", buffering=1 << 20) if deltas else None
+
+    def log(self, iteration, population, births, deaths, bbox=NO_BOX, step_time=0.0, changed=None):
+        offset = -1
+        if self.delta_file is not None and changed is not None:
+            cells = rewind.encode(changed)
+            cells = cells[np.lexsort((cells[:, 0], cells[:, 1]))]
+            if self.delta_dtype != np.int64 and len(cells):
+                limits = np.iinfo(self.delta_dtype)
+                if cells.min() < limits.min or cells.max() > limits.max:
+                    raise ValueError(f"{self.path}: registro viejo con deltas {self.delta_dtype}, no caben estas coordenadas")
+            data = zlib.compress(cells.astype(self.delta_dtype).tobytes(), 1)
+            offset = self.delta_file.tell()
+            self.delta_file.write(struct.pack("<I", len(data)) + data)
+        self.buffer[self.count] = (iteration, population, births, deaths, *bbox, step_time, offset)
+        self.count += 1
+        if self.count == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer[:self.count].tobytes())
+        self.count = 0
+        self.file.flush()
+        if self.delta_file is not None:
+            self.delta_file.flush()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+        if self.delta_file is not None:
+            self.delta_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: no es un registro de corrida")
+        (size,) = struct.unpack("<I", f.read(4))
+        return json.loads(f.read(size)), len(MAGIC) + 4 + size
+
+
+def read_log(path):
+    # arreglo estructurado sobre el archivo; sólo se leen las páginas usadas
+    header, offset = read_header(path)
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        count = (f.tell() - offset) // RECORD.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=RECORD)
+    return np.memmap(path, dtype=RECORD, mode="r", offset=offset, shape=(count,))
+
+
+def read_delta(path, record, header=None):
+    # células (col, fila) que cambiaron en la generación de `record`; para
+    # leer muchas conviene pasar la cabecera de read_header
+    if record["delta_offset"] < 0:
+        return None
+    if header is None:
+        header = read_header(path)[0]
+    with open(path + ".deltas", "rb") as f:
+        f.seek(int(record["delta_offset"]))
+        (size,) = struct.unpack("<I", f.read(4))
+        cells = np.frombuffer(zlib.decompress(f.read(size)), dtype=header.get("delta_dtype", OLD_DELTA_DTYPE))
+    return rewind.decode(cells.reshape(-1, 2))
@@ -0,0 +1,944 @@
+import json
+import random
+import time
+
+import numpy as np
+
+import dense
+import bitlife
+import hashlife
+import sparse
+import tiles
+import zobrist
+import rules
+import parallel
+import chunks
+import ltl
+import generations
+import neighborhoods
+import rewind
+import patterns
+import snapshot
+import runlog
+import mipmap
+import spatial
+
+# Núcleo sin interfaz: el estado del tablero, la regla, el borde y el motor
+# viven en un objeto Simulation que no importa pygame ni tkinter. Los
+# frontends (v11, practica1, p1) y el ejecutor por línea de comandos
+# (life_run.py) sólo llaman a sus métodos.
+#
+# En un tablero fijo, "densa", "teselas", "paralela", "bits" y las reglas de
+# varios estados guardan el tablero en su forma nativa entre pasos (arreglo
+# uint8, palabras uint64 o estados uint8) y el set de posiciones sólo se
+# arma cuando alguien lo pide. En el plano infinito hashlife guarda la foto
+# de su quadtree (hashlife.Pattern) y los demás motores el mapa de trozos
+# (chunks.ChunkMap); de las dos sólo se expande la región que se dibuja.
+
+# "infinita" quita el límite de width x height: el plano crece por trozos
+BOUNDARIES = ["toro", "nula", "infinita"]
+# NumPy, uint64 empaquetado, conteo en una pasada, quadtree, bloques con
+# regiones activas, franjas en varios procesos y el adjust_grid original
+ENGINES = ["densa", "bits", "dispersa", "hashlife", "teselas", "paralela", "set"]
+NEIGHBORHOODS = [neighborhoods.MOORE, neighborhoods.VON_NEUMANN, neighborhoods.HEXAGONAL]
+# con más células cambiadas pendientes de dibujar conviene repintar todo
+MAX_DIRTY = 1 << 16
+# con más de 1/PYRAMID_RESET de las células del tablero cambiadas (una sopa
+# fresca en hashlife) sale más barato rearmar la pirámide que corregirla
+PYRAMID_RESET = 16
+# formas del plano infinito: fotos inmutables con population, cells(),
+# window(), get() y `in`
+PLANE_KINDS = ("hashlife", "chunks")
+
+
+def board_population(kind, data):
+    if kind == "words":
+        return bitlife.population(data)
+    if kind == "states":
+        return int(np.count_nonzero(data == 1))
+    if kind in PLANE_KINDS:
+        return data.population
+    return int(np.count_nonzero(data))
+
+
+def engine_allowed(engine, boundary):
+    # hashlife simula el plano ilimitado: con toro o nula no respetaría el borde
+    return engine != "hashlife" or boundary == "infinita"
+
+
+def rule_allowed(rule_str, boundary):
+    # Generations y LtL guardan sus estados en un arreglo de width x height:
+    # en el plano infinito se perdería lo que sale del cuadro
+    return boundary != "infinita" or not (ltl.is_ltl(rule_str) or generations.is_generations(rule_str))
+
+
+def check_rule(rule_str, boundary):
+    if not rule_allowed(rule_str, boundary):
+        raise ValueError(f"la regla {rule_str} necesita un tablero fijo (toro o nula)")
+
+
+class Simulation:
+    def __init__(self, width=1000, height=1000, rule="B3/S23", boundary="toro",
+                 engine="densa", timeline=True, detect_cycles=True):
+        if not engine_allowed(engine, boundary):
+            raise ValueError(f"el motor {engine} sólo funciona con borde infinita")
+        check_rule(rule, boundary)
+        self.width = width
+        self.height = height
+        self.rule_str = rule
+        self.boundary = boundary
+        self.engine = engine
+        self.neighborhood = neighborhoods.MOORE
+        self.step_exp = 0  # con hashlife cada paso avanza 2^step_exp generaciones
+        self.iteration = 0
+        self.seed = None  # semilla de la última sopa aleatoria
+        self.history = []  # población después de cada paso
+        self.stop_on_cycle = True
+        self.cycle_detector = zobrist.CycleDetector() if detect_cycles else None
+        self.timeline = rewind.Timeline() if timeline else None
+        self.run_log = None
+        self.pyramid = None  # pirámide de densidad para la vista alejada
+        # células cambiadas desde la última vez que el frontend dibujó
+        self.track_changes = False
+        self._dirty = []
+        self._dirty_count = 0
+        self._dirty_all = True
+        # tablero: set de posiciones y/o forma nativa ("grid", "words" o
+        # "states", arreglo; "hashlife" o "chunks", foto del plano)
+        self._positions = set()
+        self._board = None
+        # cubetas del set de posiciones para consultar sólo la vista; se arma
+        # la primera vez que se pide y desde ahí se mantiene en step()
+        self._index = None
+        # mundos que se conservan entre pasos
+        self.hashlife_universe = None
+        self.tiled_world = None
+        self.tiled_key = None
+        self.parallel_world = None
+        # (mundo, arreglo) que teselas o paralela tienen cargado
+        self.synced = None
+        # Larger than Life (R5,C0,M1,S34..58,B34..45,NM) y Generations (B2/S/C3)
+        self.state_world = None
+        self.edited()
+
+    # --- representación del tablero ---
+
+    @property
+    def positions(self):
+        if self._positions is None:
+            if self._board[0] in PLANE_KINDS:
+                self._positions = self._board[1].to_positions()
+            else:
+                self._positions = dense.grid_to_positions(self.grid)
+        return self._positions
+
+    @positions.setter
+    def positions(self, cells):
+        self._positions = set(cells)
+        self._board = None
+        self._index = None
+
+    @property
+    def grid(self):
+        if self._board is not None:
+            kind, data = self._board
+            if kind == "words":
+                return bitlife.unpack_grid(data, self.width)
+            if kind == "states":
+                return (data == 1).view(np.uint8)
+            if kind in PLANE_KINDS:
+                return data.window(0, 0, self.width, self.height)
+            return data
+        return dense.positions_to_grid(self._positions, self.width, self.height)
+
+    @grid.setter
+    def grid(self, grid):
+        self._board = ("grid", np.ascontiguousarray(grid, dtype=np.uint8))
+        self._positions = None
+        self._index = None
+
+    def board(self, kind):
+        if self._board is None or self._board[0] != kind:
+            if kind == "hashlife":
+                universe = self.get_hashlife(rules.compile_rule(self.rule_str))
+                universe.from_positions(self.positions)
+                self._board = (kind, universe.pattern())
+                return self._board[1]
+            if kind == "chunks":
+                self._board = (kind, chunks.ChunkMap.from_cells(self.cells()))
+                return self._board[1]
+            grid = self.grid
+            if kind == "words":
+                grid = bitlife.pack_grid(grid)
+            elif kind == "states":
+                # se conservan las refractarias del último paso
+                world = self.get_state_world(self.multi_state_rule())
+                world.load_grid(grid)
+                grid = world.states
+            self._board = (kind, grid)
+        return self._board[1]
+
+    def cells(self):
+        # células vivas (N, 2) de (columna, fila) sin armar el set
+        if self._board is None:
+            return rewind.encode(self._positions)
+        kind, data = self._board
+        if kind in PLANE_KINDS:
+            return data.cells()
+        if kind == "words":
+            rows, cols = bitlife.set_cells(data)
+        else:
+            rows, cols = np.divmod(np.flatnonzero(data == 1), data.shape[1])
+        return np.column_stack((cols, rows))
+
+    def keyframe(self):
+        # el tablero completo para el historial: la foto de hashlife tal cual,
+        # las demás formas como células (N, 2)
+        if self._board is not None and self._board[0] == "hashlife":
+            return self._board[1]
+        return self.cells()
+
+    def set_cells(self, cells):
+        # reemplaza el tablero por las células (N, 2) o la foto de hashlife;
+        # en un tablero fijo se arma el arreglo directo
+        if isinstance(cells, hashlife.Pattern):
+            self._board, self._positions, self._index = ("hashlife", cells), None, None
+            return
+        if self.boundary == "infinita":
+            self.positions = rewind.decode(cells)
+            return
+        grid = np.zeros((self.height, self.width), dtype=np.uint8)
+        grid[cells[:, 1], cells[:, 0]] = 1
+        self.grid = grid
+
+    @property
+    def population(self):
+        if self._positions is not None:
+            return len(self._positions)
+        return board_population(*self._board)
+
+    def spatial_index(self):
+        # índice por cubetas del set de posiciones (None con tablero nativo,
+        # que ya se puede recortar directamente)
+        if self._board is not None:
+            return None
+        if self._index is None:
+            self._index = spatial.SpatialIndex.from_positions(self._positions)
+        return self._index
+
+    def frame(self, copy=True, changes=None, levels=()):
+        # foto de lo que hace falta para dibujar. Con copy=True no comparte
+        # nada que step() o una edición modifiquen en su lugar, así otro hilo
+        # puede dibujarla mientras la simulación sigue; `levels` son los
+        # niveles de la pirámide de densidad que se incluyen
+        if levels and self.pyramid is None:
+            self.pyramid = mipmap.DensityPyramid(self.width, self.height)
+            self.pyramid.reset(self.grid)
+        return Frame(self, copy, changes, levels)
+
+    def view(self, col0, row0, cols, rows):
+        return self.frame(copy=False).view(col0, row0, cols, rows)
+
+    def density_view(self, level, col0, row0, cols, rows):
+        # vista alejada: cada píxel es un bloque de 2^level x 2^level; la
+        # pirámide se arma la primera vez y desde ahí se mantiene en step()
+        return self.frame(copy=False, levels=(level,)).density_view(level, col0, row0, cols, rows)
+
+    def states_at(self, cols, rows):
+        return self.frame(copy=False).states_at(cols, rows)
+
+    def cells_in(self, col0, row0, cols, rows):
+        return self.frame(copy=False).cells_in(col0, row0, cols, rows)
+
+    def mark_dirty(self, cells):
+        # `cells` es un arreglo (N, 2) de (columna, fila)
+        if self._dirty_all or not len(cells):
+            return
+        self._dirty.append(cells)
+        self._dirty_count += len(cells)
+        if self._dirty_count > MAX_DIRTY:
+            self._dirty_all = True
+
+    def take_changes(self):
+        # células (N, 2) que cambiaron desde la llamada anterior, o None si
+        # hay que repintar todo (tablero reemplazado o demasiados cambios)
+        dirty, everything = self._dirty, self._dirty_all
+        self._dirty, self._dirty_count, self._dirty_all = [], 0, False
+        if everything:
+            return None
+        if not dirty:
+            return np.empty((0, 2), dtype=np.int64)
+        return np.concatenate(dirty)
+
+    def on_board(self, pos):
+        col, row = pos
+        return 0 <= col < self.width and 0 <= row < self.height
+
+    # --- edición ---
+
+    def edited(self, cell=None):
+        # el tablero cambió desde fuera: se reinicia la detección de ciclos y
+        # se guarda un keyframe. Si sólo cambió `cell`, la pirámide de
+        # densidad se corrige en vez de rearmarse.
+        if cell is None:
+            self._dirty_all = True
+        else:
+            self.mark_dirty(np.array([cell]))
+        if self.pyramid is not None:
+            if cell is None:
+                self.pyramid.reset(self.grid)
+            else:
+                plane = self._board is not None and self._board[0] in PLANE_KINDS
+                board = self._board[1] if plane else self.positions
+                delta = 1 if cell in board else -1
+                self.pyramid.add(np.array([cell[0]]), np.array([cell[1]]), np.array([delta]))
+        self.reset_cycles()
+        if self.timeline is not None:
+            self.timeline.record(self.iteration, self.keyframe)
+
+    def reset_cycles(self):
+        # el tablero cambió desde fuera: los estados vistos ya no sirven
+        if self.cycle_detector is None:
+            return
+        if self._board is not None:
+            self.cycle_detector.reset(*self._board)
+        else:
+            self.cycle_detector.reset("cells", self._positions)
+        self.cycle_detector.record(self.iteration)
+
+    def toggle(self, pos):
+        if self.boundary != "infinita" and not self.on_board(pos):
+            return False
+        if self._board is not None and self._board[0] == "hashlife":
+            # se corrige el quadtree sin expandirlo a células
+            universe = self.get_hashlife(rules.compile_rule(self.rule_str))
+            universe.load(self._board[1])
+            universe.toggle(*pos)
+            self._board = ("hashlife", universe.pattern())
+            self.edited(pos)
+            return True
+        if self._board is not None and self._board[0] == "chunks":
+            # sólo se copia el trozo de la célula
+            self._board = ("chunks", self._board[1].toggled(pos))
+            self.edited(pos)
+            return True
+        # set nuevo: el anterior puede estar en una foto que se está dibujando
+        self._positions, self._board = self.positions ^ {pos}, None
+        if self._index is not None:
+            self._index = self._index.toggled((pos,))
+        self.edited(pos)
+        return True
+
+    def clear(self):
+        self.positions = set()
+        self.iteration = 0
+        self.history.clear()
+        self.edited()
+
+    def generate_clustered(self, num_clusters=15, cells_per_cluster=2000, cluster_radius=30, seed=None):
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        rng = random.Random(self.seed)
+        cells = set()
+        for _ in range(num_clusters):
+            center_col = rng.randint(100, self.width - 100)
+            center_row = rng.randint(100, self.height - 100)
+            for _ in range(cells_per_cluster):
+                dx = rng.randint(-cluster_radius, cluster_radius)
+                dy = rng.randint(-cluster_radius, cluster_radius)
+                cells.add(((center_col + dx) % self.width, (center_row + dy) % self.height))
+        self.positions = cells
+        self.iteration = 0
+        self.history.clear()
+        self.edited()
+
+    def generate_random(self, density=0.15, seed=None):
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        rng = np.random.default_rng(self.seed)
+        # por bloques de filas: el arreglo de float64 completo ocupa 8 bytes
+        # por célula (800 MB en 10000 x 10000)
+        grid = np.empty((self.height, self.width), dtype=np.uint8)
+        for r0 in range(0, self.height, 1024):
+            rows = grid[r0:r0 + 1024]
+            rows[...] = rng.random(rows.shape) < density
+        self.grid = grid
+        self.iteration = 0
+        self.history.clear()
+        self.edited()
+
+    def set_rule(self, rule_str):
+        # se compila antes de cambiar nada: una regla inválida lanza
+        # ValueError y la simulación sigue con la anterior
+        try:
+            if ltl.is_ltl(rule_str):
+                ltl.compile_ltl(rule_str)
+            elif generations.is_generations(rule_str):
+                generations.compile_generations(rule_str)
+            else:
+                rules.compile_rule(rule_str)
+        except ValueError as error:
+            raise ValueError(f"regla inválida {rule_str!r}: {error}") from None
+        check_rule(rule_str, self.boundary)
+        self.rule_str = rule_str
+        if self._board is not None and self._board[0] == "states":
+            # los estados eran de la regla anterior: quedan sólo las vivas
+            self.grid = self.grid
+        self.edited()
+
+    def set_boundary(self, boundary):
+        if boundary not in BOUNDARIES:
+            raise ValueError(f"borde desconocido: {boundary}")
+        check_rule(self.rule_str, boundary)
+        self.boundary = boundary
+        if boundary != "infinita":
+            # al volver a un tablero fijo se descarta lo que quedó fuera
+            self.positions = set(filter(self.on_board, self.positions))
+        if not engine_allowed(self.engine, boundary):
+            self.engine = "densa"
+        self.edited()
+
+    def cycle_boundary(self):
+        # se salta "infinita" con las reglas de varios estados
+        i = BOUNDARIES.index(self.boundary)
+        for k in range(1, len(BOUNDARIES) + 1):
+            boundary = BOUNDARIES[(i + k) % len(BOUNDARIES)]
+            if rule_allowed(self.rule_str, boundary):
+                self.set_boundary(boundary)
+                return
+
+    def cycle_engine(self):
+        i = ENGINES.index(self.engine)
+        for k in range(1, len(ENGINES) + 1):
+            engine = ENGINES[(i + k) % len(ENGINES)]
+            if engine_allowed(engine, self.boundary):
+                self.engine = engine
+                return
+
+    def toggle_stop_on_cycle(self):
+        self.stop_on_cycle = not self.stop_on_cycle
+        return self.stop_on_cycle
+
+    def change_step_exp(self, delta):
+        # hashlife avanza 2^step_exp generaciones por paso, con 0 <= step_exp <= 40
+        self.step_exp = min(40, max(0, self.step_exp + delta))
+
+    def cycle_neighborhood(self):
+        i = NEIGHBORHOODS.index(self.neighborhood) if self.neighborhood in NEIGHBORHOODS else -1
+        self.neighborhood = NEIGHBORHOODS[(i + 1) % len(NEIGHBORHOODS)]
+
+    def rewind(self):
+        # vuelve a la generación grabada anterior; False si no hay
+        if self.timeline is None:
+            return False
+        target = self.timeline.previous(self.iteration)
+        if target is None:
+            return False
+        self.iteration, cells = self.timeline.seek(target)
+        self.set_cells(cells)
+        if self.history:
+            self.history.pop()
+        self._dirty_all = True
+        if self.pyramid is not None:
+            self.pyramid.reset(self.grid)
+        self.reset_cycles()
+        return True
+
+    # --- motores ---
+
+    def fold_cells(self, cells):
+        # aplica el borde a una lista de células sin plegar
+        folded = []
+        for nc, nr in cells:
+            if self.boundary == "toro":
+                nc %= self.width
+                nr %= self.height
+            if self.boundary == "infinita" or self.on_board((nc, nr)):
+                folded.append((nc, nr))
+        return folded
+
+    def get_neighbors(self, pos):
+        return self.fold_cells(self.neighborhood.neighbors(pos))
+
+    def adjust_grid(self, pos_set):
+        rule = rules.compile_rule(self.rule_str)
+        table = neighborhoods.rule_table(rule, self.neighborhood.size)
+        born, stays = table[:, 0].tolist(), table[:, 1].tolist()
+        new_positions = set()
+        candidates = set()
+        for p in pos_set:
+            candidates.add(p)
+            candidates.update(self.fold_cells(self.neighborhood.sources(p)))
+        for cell in candidates:
+            count = sum((n in pos_set) for n in self.get_neighbors(cell))
+            if cell in pos_set:
+                if stays[count]:
+                    new_positions.add(cell)
+            elif born[count]:
+                new_positions.add(cell)
+        return new_positions
+
+    def native_kind(self):
+        # forma nativa del motor actual, o None si el motor trabaja con el set
+        if self.boundary == "infinita":
+            if self.engine == "set" or not self.neighborhood.moore or self.multi_state_rule() is not None:
+                return None
+            if self.engine == "hashlife" and rules.compile_rule(self.rule_str).totalistic:
+                return "hashlife"
+            # los motores de tablero fijo (y hashlife con una regla que no
+            # admite) pasan al mapa de trozos
+            return "chunks"
+        if self.multi_state_rule() is not None:
+            return "states"
+        if not self.neighborhood.moore:
+            # los demás motores asumen la vecindad de Moore: pasan a la densa
+            return None if self.engine == "set" else "grid"
+        if self.engine in ("densa", "teselas", "paralela"):
+            return "grid"
+        if self.engine == "bits":
+            return "words"
+        return None
+
+    def step_board(self, kind, old):
+        # un paso sobre el tablero nativo; devuelve un arreglo nuevo
+        if kind == "states":
+            world = self.get_state_world(self.multi_state_rule())
+            world.states = old
+            world.step()
+            return world.states
+        rule = rules.compile_rule(self.rule_str)
+        if kind == "hashlife":
+            universe = self.get_hashlife(rule)
+            if universe.root is not old.root or universe.origin != old.origin:
+                universe.load(old)
+            universe.advance_pow2(self.step_exp)
+            return universe.pattern()
+        if kind == "chunks":
+            return chunks.step(old, rule)
+        if kind == "words":
+            return bitlife.step_words(old, self.width, rule, self.boundary)
+        if self.neighborhood.moore and self.engine == "teselas":
+            return self.step_world(self.get_tiled_world(rule), old)
+        if self.neighborhood.moore and self.engine == "paralela":
+            return self.step_world(self.get_parallel_world(rule), old)
+        return dense.step_grid(old, rule, self.boundary, self.neighborhood)
+
+    def step_world(self, world, old):
+        # teselas y paralela conservan su tablero entre pasos; sólo se carga
+        # de nuevo si el de la simulación cambió desde fuera
+        if self.synced is None or self.synced[0] is not world or self.synced[1] is not old:
+            world.load_grid(old)
+        world.step()
+        new = world.board()
+        self.synced = (world, new)
+        return new
+
+    def next_generation(self, pos_set):
+        # motores que trabajan con el set: "dispersa", "set" y las vecindades
+        # que no son de Moore en el plano infinito
+        if self.neighborhood.moore and self.boundary != "infinita" and self.engine == "dispersa":
+            rule = rules.compile_rule(self.rule_str)
+            return sparse.adjust_grid_sparse(pos_set, rule, self.boundary, self.width, self.height)
+        return self.adjust_grid(pos_set)
+
+    def get_hashlife(self, rule):
+        # se conserva entre pasos para reutilizar los resultados memorizados
+        if self.hashlife_universe is None or self.hashlife_universe.rule is not rule:
+            self.hashlife_universe = hashlife.HashLife(rule)
+        return self.hashlife_universe
+
+    def get_tiled_world(self, rule):
+        # se conserva entre pasos para recordar qué bloques están estables
+        key = (rule, self.boundary)
+        if self.tiled_world is None or self.tiled_key != key:
+            self.tiled_world = tiles.TiledLife(self.width, self.height, rule, self.boundary)
+            self.tiled_key = key
+        return self.tiled_world
+
+    def get_parallel_world(self, rule):
+        # los procesos se crean una vez y se reemplazan si cambia la regla o
+        # el borde, o si se detuvieron porque uno murió
+        world = self.parallel_world
+        if world is None or world.rule is not rule or world.boundary != self.boundary or not world.processes:
+            if world is not None:
+                world.close()
+            self.parallel_world = parallel.ParallelLife(self.width, self.height, rule, self.boundary)
+        return self.parallel_world
+
+    def multi_state_rule(self):
+        if ltl.is_ltl(self.rule_str):
+            return ltl.compile_ltl(self.rule_str)
+        if generations.is_generations(self.rule_str):
+            return generations.compile_generations(self.rule_str)
+        return None
+
+    def get_state_world(self, rule):
+        # se conserva entre pasos para recordar los estados de decaimiento (C > 2)
+        world = self.state_world
+        if world is None or world.rule is not rule or world.boundary != self.boundary:
+            step_rule = ltl.step_ltl if isinstance(rule, ltl.LtlRule) else generations.step_states
+            self.state_world = generations.StateWorld(self.width, self.height, rule, self.boundary, step_rule)
+        return self.state_world
+
+    def engine_status(self):
+        if ltl.is_ltl(self.rule_str):
+            return "  (LtL)"
+        if generations.is_generations(self.rule_str):
+            return "  (Generations)"
+        if not self.neighborhood.moore:
+            return f"  Vecindad: {self.neighborhood.name}"
+        if self.native_kind() == "hashlife":
+            return f"  Paso: {self.generations_per_step()}"
+        if self._board is not None and self._board[0] == "chunks":
+            return f"  Trozos: {len(self._board[1].chunks)}"
+        if self.engine == "teselas" and self.tiled_world is not None and self.tiled_world.tile_history:
+            active, frozen, idle = self.tiled_world.tile_history[-1]
+            return f"  Bloques activos: {active}/{active + frozen + idle}"
+        return ""
+
+    def generations_per_step(self):
+        return 2 ** self.step_exp if self.native_kind() == "hashlife" else 1
+
+    # --- avance ---
+
+    def step(self):
+        # avanza un paso; devuelve (transitorio, periodo) si acaba de
+        # detectarse que el tablero se volvió periódico
+        kind = self.native_kind()
+        started = time.perf_counter()
+        if kind is not None:
+            old = self.board(kind)
+            new = self.step_board(kind, old)
+            step_time = time.perf_counter() - started
+            self._board = (kind, new)
+            self._positions = None
+            self._index = None
+            changed = None
+            if kind == "chunks":
+                # el diff por trozos da las células y si nacieron: lo usan el
+                # historial, la pirámide y el registro
+                if self.timeline is not None or self.track_changes or self.pyramid is not None \
+                        or self.run_log is not None:
+                    changed, born = chunks.diff(old, new)
+            elif kind == "hashlife":
+                # el quadtree no guarda qué cambió: sólo el registro de deltas
+                # compara las células
+                if self.run_log is not None and self.run_log.delta_file:
+                    changed = self.native_changed_cells(kind, old, new)
+            elif self.timeline is not None or self.track_changes or (self.run_log is not None and self.run_log.delta_file):
+                # células (N, 2) que cambiaron, sólo si alguien las usa
+                changed = self.native_changed_cells(kind, old, new)
+        else:
+            old_positions = self.positions
+            new_positions = self.next_generation(old_positions)
+            step_time = time.perf_counter() - started
+            changed = old_positions ^ new_positions
+            # nacimientos + muertes = cambiadas; nacimientos - muertes = diferencia de población
+            births = (len(changed) + len(new_positions) - len(old_positions)) // 2
+            deaths = len(changed) - births
+            self._positions, self._board = new_positions, None
+            if self._index is not None:
+                self._index = self._index.toggled(changed)
+        if self.pyramid is not None:
+            if kind == "grid":
+                self.pyramid.update_grid(old, new)
+            elif kind == "states":
+                self.pyramid.update_grid((old == 1).view(np.uint8), (new == 1).view(np.uint8))
+            elif kind == "words":
+                self.pyramid.update_words(old, new)
+            elif kind == "hashlife":
+                # sólo los bloques del quadtree que cambiaron dentro del tablero
+                cols, rows, delta = hashlife.window_delta(old, new, 0, 0, self.width, self.height)
+                if len(delta) > self.width * self.height // PYRAMID_RESET:
+                    self.pyramid.reset(self.grid)
+                else:
+                    self.pyramid.add(cols, rows, delta)
+            elif kind == "chunks":
+                self.pyramid.add(changed[:, 0], changed[:, 1], born.astype(np.int16) * 2 - 1)
+            else:
+                self.pyramid.update(changed, new_positions)
+        if self.cycle_detector is not None:
+            if kind is None:
+                self.cycle_detector.update("cells", new_positions)
+            else:
+                self.cycle_detector.update(kind, new)
+        self.iteration += self.generations_per_step()
+        population = self.population
+        self.history.append(population)
+        if self.timeline is not None:
+            # el tablero completo sólo se pide cada keyframe_interval generaciones
+            self.timeline.record(self.iteration, self.keyframe, changed)
+        if self.track_changes:
+            if kind == "states":
+                # los refractarios cambian de color aunque no nazcan ni mueran
+                self.mark_dirty(self.native_changed_cells("grid", old, new))
+            elif kind == "hashlife":
+                self._dirty_all = True
+            else:
+                self.mark_dirty(rewind.encode(changed))
+        if self.run_log is not None:
+            if kind == "chunks":
+                births = int(np.count_nonzero(born))
+                deaths = len(born) - births
+            elif kind is not None:
+                # sólo el registro los usa: con tableros grandes cuestan un
+                # tercio del paso
+                births, deaths = self.native_changes(kind, old, new)
+            self.run_log.log(self.iteration, population, births, deaths,
+                             self.bounding_box(), step_time, changed)
+        if self.cycle_detector is None:
+            return None
+        # con hashlife el periodo medido puede ser un múltiplo del real
+        # (los saltos de 2^k generaciones no pasan por los estados intermedios)
+        known = self.cycle_detector.period is not None
+        cycle = self.cycle_detector.record(self.iteration)
+        if cycle and not known and population:
+            return cycle
+        return None
+
+    def native_changes(self, kind, old, new):
+        if kind == "hashlife":
+            changed = len(self.native_changed_cells(kind, old, new))
+            births = (changed + new.population - old.population) // 2
+            return births, changed - births
+        if kind == "words":
+            return bitlife.population(new & ~old), bitlife.population(old & ~new)
+        if kind == "states":
+            old, new = old == 1, new == 1
+        return int(np.count_nonzero(new > old)), int(np.count_nonzero(new < old))
+
+    def native_changed_cells(self, kind, old, new):
+        if kind == "hashlife":
+            return rewind.xor_cells([old.cells(), new.cells()])
+        if kind == "states":
+            # sólo nacimientos y muertes; los refractarios no están en el set
+            old, new = old == 1, new == 1
+            kind = "grid"
+        if kind == "grid":
+            # flatnonzero sobre bool + divmod es más rápido que nonzero en 2D
+            rows, cols = np.divmod(np.flatnonzero(old != new), old.shape[1])
+        else:
+            rows, cols = bitlife.diff_cells(old, new)
+        return np.column_stack((cols, rows))
+
+    def bounding_box(self):
+        if self._board is not None and self._board[0] in PLANE_KINDS:
+            return runlog.bbox_of_cells(self._board[1].cells())
+        if self._board is not None and self._board[0] != "words":
+            return runlog.bbox_of_grid(self.grid)
+        if self._board is not None:
+            words = self._board[1]
+            rows = np.flatnonzero(words.any(axis=1))
+            if not len(rows):
+                return runlog.NO_BOX
+            cols = np.flatnonzero(bitlife.unpack_grid(np.bitwise_or.reduce(words, axis=0)[None, :], self.width)[0])
+            return int(cols[0]), int(rows[0]), int(cols[-1]), int(rows[-1])
+        return runlog.bbox_of_cells(self.positions)
+
+    def run(self, generations, progress=None, every=1000, fast_forward=False):
+        # avanza `generations` generaciones; con hashlife usa saltos de 2^k.
+        # Con fast_forward, al detectar un ciclo se saltan los periodos
+        # completos que faltan y sólo se simula el resto. Devuelve el ciclo
+        # detectado (si se paró por stop_on_cycle o se saltó).
+        target = self.iteration + generations
+        exp = self.step_exp
+        next_report = self.iteration + every
+        found = None
+        try:
+            while self.iteration < target:
+                if self.native_kind() == "hashlife":
+                    self.step_exp = (target - self.iteration).bit_length() - 1
+                cycle = self.step()
+                if progress is not None and self.iteration >= next_report:
+                    progress(self)
+                    next_report = self.iteration + every
+                if cycle and self.stop_on_cycle:
+                    return cycle
+                if self.population == 0:
+                    return found
+                if cycle and fast_forward:
+                    # el tablero de target es el mismo que el de target - resto
+                    found = cycle
+                    self.iteration = target - self.cycle_detector.steps_to(self.iteration, target)
+        finally:
+            self.step_exp = exp
+        return found
+
+    # --- archivos ---
+
+    def save(self, path, compression="zlib"):
+        # el formato sale de la extensión: .vida (por defecto), .rle o .json.
+        # Una .vida sin compresión (compression=None) se abre con memmap y
+        # sólo se leen las filas que se piden
+        lower = path.lower()
+        if lower.endswith(".rle"):
+            patterns.write_rle(path, self.positions, self.rule_str)
+            return
+        if lower.endswith(".json"):
+            data = {
+                "positions": list(self.positions),
+                "rule": self.rule_str,
+                "boundary": self.boundary
+            }
+            with open(path, 'w') as f:
+                json.dump(data, f)
+            return
+        info = dict(rule=self.rule_str, boundary=self.boundary, iteration=self.iteration,
+                    seed=self.seed, compression=compression)
+        if self.boundary == "infinita":
+            # en el plano infinito se guarda la caja que contiene al patrón
+            snapshot.save_positions(path, self.positions, **info)
+        else:
+            snapshot.save(path, self.grid, **info)
+
+    def load(self, path):
+        lower = path.lower()
+        if lower.endswith(".rle"):
+            cells, rule = patterns.read_rle(path)
+            check_rule(rule or self.rule_str, self.boundary)
+            self.positions = cells
+            self.rule_str = rule or self.rule_str
+        elif lower.endswith(".mc"):
+            # el quadtree queda como tablero de hashlife, con el centro del
+            # patrón en el centro de la ventana; no se expande a células
+            universe, rule = patterns.read_macrocell(path)
+            self.rule_str = rule or "B3/S23"
+            col, row = universe.origin
+            universe.origin = (col + self.width // 2, row + self.height // 2)
+            self.hashlife_universe = universe
+            self.boundary = "infinita"
+            self.engine = "hashlife"
+            self._board, self._positions, self._index = ("hashlife", universe.pattern()), None, None
+        elif lower.endswith(".json"):
+            with open(path) as f:
+                data = json.load(f)
+            check_rule(data.get("rule", "B3/S23"), data.get("boundary", "toro"))
+            self.positions = map(tuple, data["positions"])
+            self.rule_str = data.get("rule", "B3/S23")
+            self.boundary = data.get("boundary", "toro")
+        else:
+            self.load_snapshot(snapshot.load(path))
+            return
+        if not engine_allowed(self.engine, self.boundary):
+            self.engine = "densa"
+        self.edited()
+
+    def load_snapshot(self, snap):
+        # una .vida ya abierta (así quien necesita sus dimensiones no la abre
+        # dos veces). Se lee por bandas de filas: el tablero se arma directo
+        # sin decodificar toda la instantánea a la vez
+        check_rule(snap.rule, snap.boundary)
+        if snap.boundary != "infinita" and (snap.width, snap.height) == (self.width, self.height):
+            grid = np.empty((self.height, self.width), dtype=np.uint8)
+            for r0, r1 in snap.bands():
+                grid[r0:r1] = snap.region(r0, r1, 0, snap.width) == 1
+            self.grid = grid
+        else:
+            self.positions = snap.positions()
+        self.rule_str, self.boundary = snap.rule, snap.boundary
+        self.iteration, self.seed = snap.iteration, snap.seed
+        if not engine_allowed(self.engine, self.boundary):
+            self.engine = "densa"
+        self.edited()
+
+    def start_log(self, path, deltas=False):
+        self.stop_log()
+        self.run_log = runlog.RunLog(path, self.rule_str, self.boundary, deltas=deltas)
+
+    def stop_log(self):
+        if self.run_log is not None:
+            self.run_log.close()
+            self.run_log = None
+
+    def close(self):
+        if self.parallel_world is not None:
+            self.parallel_world.close()
+            self.parallel_world = None
+        self.stop_log()
+
+
+class Frame:
+    # lo que un frontend necesita para dibujar una generación: el tablero en
+    # su forma nativa (los pasos crean arreglos y sets nuevos, no modifican
+    # los anteriores), niveles de la pirámide y las células cambiadas desde
+    # la foto anterior
+    def __init__(self, sim, copy=True, changes=None, levels=()):
+        self.width, self.height = sim.width, sim.height
+        self.iteration = sim.iteration
+        self.rule_str, self.boundary, self.engine = sim.rule_str, sim.boundary, sim.engine
+        self.status = sim.engine_status()
+        self.board = sim._board
+        self.positions = sim._positions if sim._board is None else None
+        # el índice tampoco se modifica: cada paso arma uno nuevo
+        self.index = sim.spatial_index()
+        self.states = None
+        self.state_count = 2
+        if self.board is not None and self.board[0] == "states":
+            # cada paso arma un arreglo de estados nuevo: no hace falta copiarlo
+            self.states = self.board[1]
+            self.state_count = sim.multi_state_rule().states
+        self.levels = {}
+        for level in levels:
+            counts = sim.pyramid.levels[level]
+            self.levels[level] = counts.copy() if copy else counts
+        self.changes = changes
+
+    @property
+    def population(self):
+        if self.board is None:
+            return len(self.positions)
+        return board_population(*self.board)
+
+    def view(self, col0, row0, cols, rows):
+        # estados uint8 [fila, columna] de la ventana que empieza en
+        # (col0, row0); sólo se lee esa región del tablero nativo
+        if self.board is not None and self.board[0] in PLANE_KINDS:
+            # sólo los nodos del quadtree o los trozos que tocan la ventana
+            return self.board[1].window(col0, row0, cols, rows)
+        view = np.zeros((rows, cols), dtype=np.uint8)
+        if self.states is None and self.board is None:
+            # sólo las cubetas que tocan la ventana, no toda la población
+            cells = self.index.query(col0, row0, cols, rows)
+            view[cells[:, 1] - row0, cells[:, 0] - col0] = 1
+            return view
+        r0, r1 = max(row0, 0), min(row0 + rows, self.height)
+        c0, c1 = max(col0, 0), min(col0 + cols, self.width)
+        if r0 >= r1 or c0 >= c1:
+            return view
+        if self.states is not None:
+            region = self.states[r0:r1, c0:c1]
+        elif self.board[0] == "grid":
+            region = self.board[1][r0:r1, c0:c1]
+        else:
+            # sólo se desempaquetan las palabras que cubren la ventana
+            bits = bitlife.WORD_BITS
+            w0, w1 = c0 // bits, -(-c1 // bits)
+            unpacked = bitlife.unpack_grid(self.board[1][r0:r1, w0:w1], (w1 - w0) * bits)
+            region = unpacked[:, c0 - bits * w0:c1 - bits * w0]
+        view[r0 - row0:r1 - row0, c0 - col0:c1 - col0] = region
+        return view
+
+    def cells_in(self, col0, row0, cols, rows):
+        # células vivas (N, 2) de (columna, fila) dentro del rectángulo
+        if self.states is None and self.board is None:
+            return self.index.query(col0, row0, cols, rows)
+        view = self.view(col0, row0, cols, rows)
+        r, c = np.nonzero(view == 1)
+        return np.stack((c + col0, r + row0), axis=1).astype(np.int64)
+
+    def density_view(self, level, col0, row0, cols, rows):
+        return mipmap.density_view(self.levels[level], level, col0, row0, cols, rows)
+
+    def states_at(self, cols, rows):
+        # estado de células sueltas (arreglos de columnas y filas) sin armar
+        # el tablero completo
+        if self.states is not None:
+            return self.states[rows, cols]
+        if self.board is not None:
+            kind, data = self.board
+            if kind == "grid":
+                return data[rows, cols].astype(np.uint8)
+            if kind in PLANE_KINDS:
+                return data.get(cols, rows)
+            return bitlife.get_cells(data, rows, cols)
+        cells = self.positions
+        return np.fromiter((cell in cells for cell in zip(cols.tolist(), rows.tolist())),
+                           dtype=np.uint8, count=len(cols))
@@ -0,0 +1,167 @@
+import json
+import lzma
+import struct
+import zlib
+
+import numpy as np
+
+import dense
+
+# Instantáneas binarias (.vida): el tablero se guarda como planos de bits
+# empaquetados con np.packbits (un plano para vivo/muerto, más planos si hay
+# estados refractarios) detrás de una cabecera JSON pequeña.
+#   MAGIC | longitud de la cabecera (uint32) | cabecera | relleno hasta 4096
+#   datos: plano 0 filas 0..H-1, plano 1 ..., cada fila de ceil(W / 8) bytes
+# Sin compresión los datos se abren con np.memmap y sólo se leen las páginas
+# de la región que se pide. Con zlib o lzma cada bloque de `chunk_rows` filas
+# de cada plano se comprime aparte y al final va la tabla de desplazamientos.
+
+MAGIC = b"VIDA\x01"
+ALIGN = 4096
+COMPRESSORS = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+def save(path, grid, rule="B3/S23", boundary="toro", iteration=0, seed=None,
+         origin=(0, 0), compression=None, chunk_rows=1024):
+    if compression is not None and compression not in COMPRESSORS:
+        raise ValueError(f"compresión desconocida: {compression}")
+    height, width = grid.shape
+    planes = max(1, int(grid.max()).bit_length()) if grid.size else 1
+    header = {
+        "rule": rule, "boundary": boundary, "width": width, "height": height,
+        "origin": list(origin), "iteration": iteration, "seed": seed,
+        "planes": planes, "row_bytes": (width + 7) // 8,
+        "compression": compression, "chunk_rows": chunk_rows,
+    }
+    raw = json.dumps(header).encode()
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(raw)) + raw)
+        f.write(b"\0" * (-f.tell() % ALIGN))
+        offsets = [f.tell()]
+        for plane in range(planes):
+            for r0 in range(0, height, chunk_rows):
+                rows = grid[r0:r0 + chunk_rows]
+                bits = np.packbits((rows >> plane) & 1 if planes > 1 else rows != 0, axis=1)
+                data = bits.tobytes()
+                if compression:
+                    data = COMPRESSORS[compression][0](data)
+                f.write(data)
+                offsets.append(f.tell())
+        if compression:
+            table = np.array(offsets, dtype="<u8").tobytes()
+            f.write(table + struct.pack("<Q", offsets[-1]))
+
+
+def save_positions(path, positions, width=None, height=None, **kwargs):
+    # sin dimensiones (plano infinito) se guarda la caja que contiene al patrón
+    if width is None or height is None:
+        if positions:
+            min_col = min(col for col, _ in positions)
+            min_row = min(row for _, row in positions)
+            width = max(col for col, _ in positions) - min_col + 1
+            height = max(row for _, row in positions) - min_row + 1
+        else:
+            min_col = min_row = 0
+            width = height = 1
+        shifted = {(col - min_col, row - min_row) for col, row in positions}
+        grid = dense.positions_to_grid(shifted, width, height)
+        save(path, grid, origin=(min_col, min_row), **kwargs)
+    else:
+        save(path, dense.positions_to_grid(positions, width, height), **kwargs)
+
+
+class Snapshot:
+    def __init__(self, path, mmap=True):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path}: no es una instantánea .vida")
+            (size,) = struct.unpack("<I", f.read(4))
+            self.header = json.loads(f.read(size))
+            self.offset = len(MAGIC) + 4 + size
+            self.offset += -self.offset % ALIGN
+            if self.compression:
+                f.seek(-8, 2)
+                (table_at,) = struct.unpack("<Q", f.read(8))
+                f.seek(table_at)
+                count = self.planes * self.chunk_count + 1
+                self.offsets = np.frombuffer(f.read(8 * count), dtype="<u8").tolist()
+        self.bits = None
+        if not self.compression:
+            shape = (self.planes, self.height, self.row_bytes)
+            if mmap:
+                self.bits = np.memmap(path, dtype=np.uint8, mode="r", offset=self.offset, shape=shape)
+            else:
+                self.bits = np.fromfile(path, dtype=np.uint8, count=int(np.prod(shape)),
+                                        offset=self.offset).reshape(shape)
+
+    def __getattr__(self, name):
+        # rule, boundary, width, height, origin, iteration, seed, planes, ...
+        try:
+            return self.__dict__["header"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @property
+    def chunk_count(self):
+        return -(-self.height // self.chunk_rows)
+
+    def plane_rows(self, plane, r0, r1):
+        # bytes empaquetados de las filas [r0, r1) de un plano
+        if self.bits is not None:
+            return self.bits[plane, r0:r1]
+        decompress = COMPRESSORS[self.compression][1]
+        blocks = []
+        first, last = r0 // self.chunk_rows, (r1 - 1) // self.chunk_rows
+        with open(self.path, "rb") as f:
+            for chunk in range(first, last + 1):
+                i = plane * self.chunk_count + chunk
+                f.seek(self.offsets[i])
+                data = decompress(f.read(self.offsets[i + 1] - self.offsets[i]))
+                blocks.append(np.frombuffer(data, dtype=np.uint8).reshape(-1, self.row_bytes))
+        rows = np.concatenate(blocks)
+        start = r0 - first * self.chunk_rows
+        return rows[start:start + r1 - r0]
+
+    def region(self, r0, r1, c0, c1):
+        # estados uint8 de la ventana [r0, r1) x [c0, c1); sólo se tocan esas filas y bytes
+        r0, r1 = max(r0, 0), min(r1, self.height)
+        c0, c1 = max(c0, 0), min(c1, self.width)
+        states = np.zeros((max(r1 - r0, 0), max(c1 - c0, 0)), dtype=np.uint8)
+        if states.size == 0:
+            return states
+        b0, b1 = c0 // 8, (c1 + 7) // 8
+        for plane in range(self.planes):
+            packed = np.asarray(self.plane_rows(plane, r0, r1)[:, b0:b1])
+            bits = np.unpackbits(packed, axis=1)[:, c0 - 8 * b0:c1 - 8 * b0]
+            states |= bits << plane
+        return states
+
+    def bands(self):
+        # filas [r0, r1) de a `chunk_rows`: con compresión cada banda es un
+        # bloque y se descomprime una sola vez
+        for r0 in range(0, self.height, self.chunk_rows):
+            yield r0, min(r0 + self.chunk_rows, self.height)
+
+    def grid(self):
+        return self.region(0, self.height, 0, self.width)
+
+    def cells(self):
+        # células vivas (estado 1) (N, 2) en coordenadas absolutas; se leen
+        # por bandas, sin decodificar todo el tablero a la vez
+        col0, row0 = self.origin
+        found = [np.empty((0, 2), dtype=np.int64)]
+        for r0, r1 in self.bands():
+            rows, cols = np.nonzero(self.region(r0, r1, 0, self.width) == 1)
+            found.append(np.column_stack((cols + col0, rows + r0 + row0)))
+        return np.concatenate(found).astype(np.int64)
+
+    def positions(self):
+        return set(map(tuple, self.cells().tolist()))
+
+
+def load(path, mmap=True):
+    return Snapshot(path, mmap)
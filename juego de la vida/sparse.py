@@ -0,0 +1,60 @@
+from collections import Counter
+from functools import lru_cache
+
+# Motor disperso de una sola pasada: cada célula viva suma 1 a sus 8 vecinas en
+# un Counter y después se aplica la regla con las tablas born/stays de Rule.
+# Las células se guardan como enteros (fila + 1) * stride + (columna + 1) sobre un
+# tablero con un anillo de relleno, así los vecinos son desplazamientos fijos y el
+# borde toroidal se resuelve con un mapa de plegado precalculado, sin módulo.
+
+
+@lru_cache(maxsize=None)
+def board_tables(width, height, boundary):
+    stride = width + 2
+    offsets = tuple(dr * stride + dc
+                    for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc)
+    # cada casilla del anillo de relleno apunta a la célula con la que se pliega
+    # ("toro") o a None si se descarta ("nula")
+    ring = [(pr, pc) for pr in (0, height + 1) for pc in range(width + 2)]
+    ring += [(pr, pc) for pr in range(1, height + 1) for pc in (0, width + 1)]
+    fold = {}
+    for pr, pc in ring:
+        target = None
+        if boundary == "toro":
+            target = ((pr - 1) % height + 1) * stride + (pc - 1) % width + 1
+        fold[pr * stride + pc] = target
+    return stride, offsets, fold
+
+
+def to_keys(pos_set, width, height):
+    stride = width + 2
+    return {(row + 1) * stride + col + 1 for col, row in pos_set
+            if 0 <= col < width and 0 <= row < height}
+
+
+def from_keys(keys, width):
+    stride = width + 2
+    return {(key % stride - 1, key // stride - 1) for key in keys}
+
+
+def step_keys(live, rule, boundary, width, height):
+    if not rule.totalistic:
+        raise ValueError("el motor disperso sólo admite reglas totalistas B/S")
+    born, stays = rule.born, rule.stays
+    stride, offsets, fold = board_tables(width, height, boundary)
+    counts = Counter()
+    for offset in offsets:
+        counts.update(map(offset.__add__, live))
+    for pad, target in fold.items():
+        n = counts.pop(pad, 0)
+        if n and target is not None:
+            counts[target] += n
+    births = {key for key, n in counts.items() if born[n]}
+    births -= live
+    survivors = {key for key in live if stays[counts[key]]}
+    return births | survivors
+
+
+def adjust_grid_sparse(pos_set, rule, boundary, width, height):
+    live = to_keys(pos_set, width, height)
+    return from_keys(step_keys(live, rule, boundary, width, height), width)
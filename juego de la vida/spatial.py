@@ -0,0 +1,59 @@
+import numpy as np
+
+# Índice espacial para el set de posiciones: las células se reparten en
+# cubetas de BIN x BIN según (col >> SHIFT, fila >> SHIFT). Consultar un
+# rectángulo sólo recorre las cubetas que lo tocan, así dibujar la vista
+# cuesta según lo visible y no según la población.
+# El índice no se modifica: toggled() devuelve uno nuevo que comparte las
+# cubetas que no cambiaron, así una foto publicada a otro hilo sigue valiendo.
+
+SHIFT = 6
+BIN = 1 << SHIFT
+
+
+class SpatialIndex:
+    __slots__ = ("bins",)
+
+    def __init__(self, bins=None):
+        self.bins = bins if bins is not None else {}  # (bx, by) -> frozenset de (col, fila)
+
+    @classmethod
+    def from_positions(cls, positions):
+        groups = {}
+        for cell in positions:
+            groups.setdefault((cell[0] >> SHIFT, cell[1] >> SHIFT), []).append(cell)
+        return cls({key: frozenset(cells) for key, cells in groups.items()})
+
+    def toggled(self, changed):
+        # índice con las células de `changed` invertidas (nacidas o muertas)
+        groups = {}
+        for cell in changed:
+            groups.setdefault((cell[0] >> SHIFT, cell[1] >> SHIFT), []).append(cell)
+        bins = dict(self.bins)
+        for key, cells in groups.items():
+            cells = bins.get(key, frozenset()).symmetric_difference(cells)
+            if cells:
+                bins[key] = cells
+            else:
+                bins.pop(key, None)
+        return SpatialIndex(bins)
+
+    def __contains__(self, cell):
+        return cell in self.bins.get((cell[0] >> SHIFT, cell[1] >> SHIFT), ())
+
+    def __len__(self):
+        return sum(map(len, self.bins.values()))
+
+    def query(self, col0, row0, cols, rows):
+        # arreglo (N, 2) de (col, fila) de las células dentro del rectángulo
+        found = []
+        for by in range(row0 >> SHIFT, ((row0 + rows - 1) >> SHIFT) + 1):
+            for bx in range(col0 >> SHIFT, ((col0 + cols - 1) >> SHIFT) + 1):
+                cells = self.bins.get((bx, by))
+                if cells:
+                    found.extend(cells)
+        if not found:
+            return np.empty((0, 2), dtype=np.int64)
+        cells = np.array(found, dtype=np.int64)
+        c, r = cells[:, 0] - col0, cells[:, 1] - row0
+        return cells[(c >= 0) & (c < cols) & (r >= 0) & (r < rows)]
@@ -0,0 +1,98 @@
+import simulation
+import zobrist
+
+# Detección de ciclos y avance rápido: el periodo detectado es el real, el
+# tablero se repite de verdad y saltar periodos llega al mismo tablero que
+# avanzar paso a paso.
+#   python -m pytest test_cycles.py    o    python test_cycles.py
+
+FIXED_ENGINES = ["densa", "bits", "dispersa", "teselas", "set"]
+GLIDER = {(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)}
+BLINKER = {(10, 10), (11, 10), (12, 10)}
+BLOCK = {(3, 3), (4, 3), (3, 4), (4, 4)}
+
+
+def make(engine, boundary="toro", size=(16, 16), cells=None, seed=None, rule="B3/S23", **options):
+    sim = simulation.Simulation(*size, rule, boundary, engine, timeline=False, **options)
+    if cells is not None:
+        sim.positions = cells
+    else:
+        sim.generate_random(0.3, seed)
+    return sim
+
+
+def test_exact_period():
+    # el periodo sale exacto aunque el tablero se hashee cada `every` pasos
+    for engine in FIXED_ENGINES:
+        for cells, period in ((BLOCK, 1), (BLINKER | BLOCK, 2), (GLIDER, 64)):
+            sim = make(engine, cells=cells)
+            transient, found = sim.run(500)
+            assert found == period, (engine, period, found)
+            assert transient + period <= sim.iteration
+
+
+def test_soup_repeats():
+    # el estado en transitorio + periodo es el mismo que en el transitorio
+    for engine in FIXED_ENGINES:
+        for seed in (1, 2):
+            sim = make(engine, size=(30, 24), seed=seed)
+            transient, period = sim.run(3000)
+            plain = make(engine, size=(30, 24), seed=seed, detect_cycles=False)
+            plain.run(transient)
+            before = plain.positions
+            plain.run(period)
+            assert plain.positions == before, (engine, seed)
+            if period > 1:
+                plain.run(1)
+                assert plain.positions != before, (engine, seed)
+
+
+def test_fast_forward():
+    cases = [(engine, "toro", seed) for engine in FIXED_ENGINES for seed in (1, 2)]
+    # hashlife avanza en saltos de 2^k: el periodo medido puede ser un múltiplo
+    cases += [("hashlife", "infinita", None), ("densa", "infinita", None)]
+    for engine, boundary, seed in cases:
+        cells = BLINKER | BLOCK | {(c + 20, r) for c, r in BLINKER} if seed is None else None
+        jumped = make(engine, boundary, (30, 24), cells, seed)
+        jumped.stop_on_cycle = False
+        found = jumped.run(12345, fast_forward=True)
+        plain = make(engine, boundary, (30, 24), cells, seed, detect_cycles=False)
+        plain.run(12345)
+        assert found is not None, (engine, seed)
+        assert jumped.iteration == plain.iteration == 12345, (engine, seed)
+        assert jumped.positions == plain.positions, (engine, seed)
+
+
+def test_edit_resets():
+    sim = make("densa", cells=BLINKER)
+    assert sim.run(40)[1] == 2
+    edited = sim.iteration
+    sim.toggle((0, 0))
+    assert sim.cycle_detector.period is None
+    # la célula suelta muere y queda el parpadeador: otro ciclo desde ahí
+    transient, period = sim.run(40)
+    assert period == 2 and transient >= edited
+
+
+def test_detector_cadence():
+    # entre muestras no hay hash; el periodo de una secuencia con periodo 3
+    # sale exacto aunque la cadencia sea 16
+    boards = [{(0, 0)}, {(1, 0)}, {(2, 0)}]
+    detector = zobrist.CycleDetector(every=16)
+    detector.reset("cells", boards[0])
+    detector.record(0)
+    found = None
+    for generation in range(1, 200):
+        detector.update("cells", boards[generation % 3])
+        found = detector.record(generation)
+        if found:
+            break
+    assert found[1] == 3
+    assert boards[found[0] % 3] == boards[(found[0] + 3) % 3]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
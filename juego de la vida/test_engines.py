@@ -0,0 +1,144 @@
+import numpy as np
+
+import mipmap
+import simulation
+
+# Equivalencia de los motores con el adjust_grid original de v11.py (el del
+# commit base, copiado abajo sin depender de nada del árbol): misma sopa,
+# mismas generaciones y el mismo set de posiciones en cada paso.
+#   python -m pytest test_engines.py    o    python test_engines.py
+
+RULES = ["B3/S23", "B36/S23", "B2/S"]
+SIZES = [(16, 16), (37, 23), (70, 50)]
+GENERATIONS = 20
+
+
+# --- oráculo: v11.py original; el tamaño, el borde y la regla pasan como
+# argumentos en vez de globales y "infinita" no recorta al tablero ---
+
+def parse_rule(rule):
+    b, s = rule.split('/')
+    birth = list(map(int, b[1:]))
+    survive = list(map(int, s[1:]))
+    return birth, survive
+
+
+def get_neighbors(pos, width, height, boundary):
+    col, row = pos
+    neighbors = []
+    for dc in [-1, 0, 1]:
+        for dr in [-1, 0, 1]:
+            if dc == 0 and dr == 0:
+                continue
+            nc, nr = col + dc, row + dr
+            if boundary == "toro":
+                nc %= width
+                nr %= height
+            if boundary == "infinita" or 0 <= nc < width and 0 <= nr < height:
+                neighbors.append((nc, nr))
+    return neighbors
+
+
+def adjust_grid(pos_set, rule_str, width, height, boundary):
+    birth, survive = parse_rule(rule_str)
+    new_positions = set()
+    candidates = set()
+    for p in pos_set:
+        candidates.add(p)
+        candidates.update(get_neighbors(p, width, height, boundary))
+    for cell in candidates:
+        count = sum((n in pos_set) for n in get_neighbors(cell, width, height, boundary))
+        if cell in pos_set and count in survive:
+            new_positions.add(cell)
+        elif cell not in pos_set and count in birth:
+            new_positions.add(cell)
+    return new_positions
+
+
+def soup(size, seed=3):
+    sim = simulation.Simulation(*size, timeline=False, detect_cycles=False)
+    sim.generate_random(0.35, seed)
+    return set(sim.positions)
+
+
+def run_oracle(rule, boundary, size, generations=GENERATIONS):
+    positions = soup(size)
+    boards = []
+    for g in range(generations):
+        positions = adjust_grid(positions, rule, *size, boundary)
+        if g == 5:
+            positions ^= {(size[0] // 2, size[1] // 2)}
+        boards.append(frozenset(positions))
+    return boards
+
+
+def run(engine, rule, boundary, size, generations=GENERATIONS):
+    sim = simulation.Simulation(*size, rule, boundary, engine, timeline=False, detect_cycles=False)
+    sim.positions = soup(size)
+    boards = []
+    for g in range(generations):
+        sim.step()
+        if g == 5:
+            # una edición a mitad de camino obliga a recargar el tablero nativo
+            sim.toggle((size[0] // 2, size[1] // 2))
+        boards.append(frozenset(sim.positions))
+    sim.close()
+    return boards
+
+
+def check(engines, boundaries):
+    for boundary in boundaries:
+        for rule in RULES:
+            for size in SIZES:
+                expected = run_oracle(rule, boundary, size)
+                for engine in engines:
+                    assert run(engine, rule, boundary, size) == expected, (engine, rule, boundary, size)
+
+
+def test_fixed_boards():
+    # todos los motores de tablero fijo en los dos bordes
+    check(["set", "densa", "bits", "dispersa", "teselas", "paralela"], ["toro", "nula"])
+
+
+def test_unbounded_plane():
+    # en "infinita" densa pasa al mapa de trozos; hashlife avanza de a una generación
+    check(["set", "densa", "hashlife"], ["infinita"])
+
+
+def test_hashlife_jumps():
+    # run() con hashlife avanza en saltos de 2^k y debe llegar al mismo tablero
+    for rule in RULES:
+        expected = soup((37, 23))
+        for _ in range(45):
+            expected = adjust_grid(expected, rule, 37, 23, "infinita")
+        sim = simulation.Simulation(37, 23, rule, "infinita", "hashlife", timeline=False, detect_cycles=False)
+        sim.positions = soup((37, 23))
+        sim.run(45)
+        assert sim.iteration == 45, rule
+        assert sim.positions == expected, rule
+
+
+def test_density_pyramid():
+    # la pirámide que se corrige con los cambios de cada paso es la misma que
+    # se arma de cero; en hashlife la sopa entera la rearma y la de una
+    # esquina cambia poco y la corrige
+    corner = {(c, r) for c, r in soup((70, 50)) if c < 20 and r < 20}
+    boards = [("densa", "toro"), ("bits", "nula"), ("set", "toro"), ("densa", "infinita"), ("hashlife", "infinita")]
+    for (engine, boundary), cells in [(board, cells) for board in boards for cells in (soup((70, 50)), corner)]:
+        sim = simulation.Simulation(70, 50, "B3/S23", boundary, engine, timeline=False, detect_cycles=False)
+        sim.positions = cells
+        sim.frame(levels=(1,))
+        for g in range(60):
+            sim.step()
+            fresh = mipmap.DensityPyramid(70, 50)
+            fresh.reset(sim.grid)
+            for k in range(1, fresh.depth + 1):
+                assert np.array_equal(sim.pyramid.levels[k], fresh.levels[k]), (engine, g, k)
+        sim.close()
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,82 @@
+import numpy as np
+
+import ltl
+import simulation
+
+# step_ltl (tabla de sumas) contra una referencia ingenua que recorre el
+# cuadrado de radio R de cada célula: O(r^2) por célula.
+#   python -m pytest test_ltl.py    o    python test_ltl.py
+
+RULES = [
+    "R1,C0,M0,S2..3,B3..3,NM",
+    "R2,C0,M1,S5..9,B4..6,NM",
+    "R3,C4,M1,S10..20,B8..14,NM",
+    # radio mayor que el tablero: en el toro el cuadrado da más de una vuelta
+    "R5,C3,M0,S20..40,B15..30,NM",
+]
+SIZES = [(12, 9), (20, 15)]
+GENERATIONS = 8
+
+
+def naive_step(states, rule, boundary):
+    height, width = states.shape
+    new = np.zeros_like(states)
+    r = rule.radius
+    for row in range(height):
+        for col in range(width):
+            count = 0
+            for dr in range(-r, r + 1):
+                for dc in range(-r, r + 1):
+                    if dr == 0 and dc == 0 and not rule.middle:
+                        continue
+                    nr, nc = row + dr, col + dc
+                    if boundary == "toro":
+                        nr, nc = nr % height, nc % width
+                    elif not (0 <= nr < height and 0 <= nc < width):
+                        continue
+                    count += states[nr, nc] == 1
+            state = states[row, col]
+            if state == 1:
+                if rule.survive[0] <= count <= rule.survive[1]:
+                    new[row, col] = 1
+                elif rule.states > 2:
+                    new[row, col] = 2 % rule.states
+            elif state == 0:
+                if rule.birth[0] <= count <= rule.birth[1]:
+                    new[row, col] = 1
+            else:
+                new[row, col] = (state + 1) % rule.states
+    return new
+
+
+def test_step_ltl():
+    for rule_str in RULES:
+        rule = ltl.compile_ltl(rule_str)
+        for boundary in ("toro", "nula"):
+            for width, height in SIZES:
+                rng = np.random.default_rng(7)
+                states = (rng.random((height, width)) < 0.4).astype(np.uint8)
+                for g in range(GENERATIONS):
+                    expected = naive_step(states, rule, boundary)
+                    states = ltl.step_ltl(states, rule, boundary)
+                    assert np.array_equal(states, expected), (rule_str, boundary, width, g)
+
+
+def test_simulation():
+    # la simulación guarda los estados de decaimiento entre pasos
+    rule_str = RULES[2]
+    rule = ltl.compile_ltl(rule_str)
+    sim = simulation.Simulation(20, 15, rule_str, "toro", timeline=False, detect_cycles=False)
+    sim.generate_random(0.4, seed=2)
+    states = sim.grid.astype(np.uint8)
+    for _ in range(GENERATIONS):
+        sim.step()
+        states = naive_step(states, rule, "toro")
+        assert sim.positions == {(c, r) for r, c in zip(*np.nonzero(states == 1))}
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,115 @@
+import numpy as np
+
+import neighborhoods
+import rules
+import simulation
+
+# Vecindades contra fuerza bruta: cada vecina se decide con su definición
+# geométrica (distancia de Chebyshev, de Manhattan o hexagonal en coordenadas
+# cúbicas, o la máscara tal cual), sin pasar por los desplazamientos compilados.
+#   python -m pytest test_neighborhoods.py    o    python test_neighborhoods.py
+
+SIZES = [(11, 7), (16, 10)]
+# una máscara asimétrica: sus fuentes no coinciden con sus vecinas
+ASYMMETRIC = np.array([[0, 1, 1, 0, 0],
+                       [0, 0, 0, 0, 1],
+                       [0, 0, 0, 0, 0],
+                       [1, 0, 0, 0, 0],
+                       [0, 0, 0, 0, 0]], dtype=bool)
+
+
+def hex_distance(a, b):
+    # odd-r a coordenadas cúbicas
+    def cube(col, row):
+        x = col - (row - (row & 1)) // 2
+        return x, row, -x - row
+    (x0, y0, z0), (x1, y1, z1) = cube(*a), cube(*b)
+    return max(abs(x0 - x1), abs(y0 - y1), abs(z0 - z1))
+
+
+def cases():
+    # (vecindad, es_vecina(celula, otra))
+    yield neighborhoods.moore(1), lambda a, b: max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1
+    yield neighborhoods.moore(2), lambda a, b: 0 < max(abs(a[0] - b[0]), abs(a[1] - b[1])) <= 2
+    yield neighborhoods.von_neumann(1), lambda a, b: abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1
+    yield neighborhoods.von_neumann(2), lambda a, b: 0 < abs(a[0] - b[0]) + abs(a[1] - b[1]) <= 2
+    yield neighborhoods.hexagonal(), lambda a, b: hex_distance(a, b) == 1
+
+    def masked(a, b):
+        dc, dr = b[0] - a[0], b[1] - a[1]
+        return abs(dr) <= 2 and abs(dc) <= 2 and bool(ASYMMETRIC[dr + 2, dc + 2])
+    yield neighborhoods.from_mask(ASYMMETRIC), masked
+
+
+def brute_neighbors(cell, is_neighbor, reach=2):
+    col, row = cell
+    return [(col + dc, row + dr) for dr in range(-reach, reach + 1) for dc in range(-reach, reach + 1)
+            if is_neighbor(cell, (col + dc, row + dr))]
+
+
+def brute_count(grid, is_neighbor, boundary):
+    height, width = grid.shape
+    counts = np.zeros_like(grid, dtype=np.int64)
+    for row in range(height):
+        for col in range(width):
+            for nc, nr in brute_neighbors((col, row), is_neighbor):
+                if boundary == "toro":
+                    counts[row, col] += grid[nr % height, nc % width]
+                elif 0 <= nr < height and 0 <= nc < width:
+                    counts[row, col] += grid[nr, nc]
+    return counts
+
+
+def test_neighbors_and_sources():
+    for hood, is_neighbor in cases():
+        for row in range(-3, 4):
+            for col in range(-3, 4):
+                cell = (col, row)
+                assert sorted(hood.neighbors(cell)) == sorted(brute_neighbors(cell, is_neighbor)), (hood, cell)
+                # fuentes: las células que tienen a `cell` entre sus vecinas
+                sources = [(col + dc, row + dr) for dr in range(-2, 3) for dc in range(-2, 3)
+                           if is_neighbor((col + dc, row + dr), cell)]
+                assert sorted(hood.sources(cell)) == sorted(sources), (hood, cell)
+
+
+def test_count():
+    rng = np.random.default_rng(4)
+    for hood, is_neighbor in cases():
+        for boundary in ("toro", "nula"):
+            for width, height in SIZES:
+                grid = (rng.random((height, width)) < 0.45).astype(np.uint8)
+                expected = brute_count(grid, is_neighbor, boundary)
+                assert np.array_equal(hood.count(grid, boundary), expected), (hood, boundary, width)
+
+
+def test_simulation():
+    # densa (conteo por desplazamientos) y set (adjust_grid con sources) contra
+    # la regla aplicada a los conteos de fuerza bruta
+    rule = rules.compile_rule("B2/S13")
+    for hood, is_neighbor in cases():
+        if hood.size > 8:
+            continue
+        for boundary in ("toro", "nula"):
+            width, height = SIZES[1]
+            sims = []
+            for engine in ("densa", "set"):
+                sim = simulation.Simulation(width, height, "B2/S13", boundary, engine,
+                                            timeline=False, detect_cycles=False)
+                sim.neighborhood = hood
+                sim.generate_random(0.3, seed=9)
+                sims.append(sim)
+            grid = sims[0].grid.astype(np.uint8)
+            for _ in range(6):
+                counts = brute_count(grid, is_neighbor, boundary)
+                grid = rule.table[counts, grid]
+                expected = {(c, r) for r, c in zip(*np.nonzero(grid))}
+                for sim in sims:
+                    sim.step()
+                    assert sim.positions == expected, (hood, boundary, sim.engine)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
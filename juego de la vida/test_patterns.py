@@ -0,0 +1,111 @@
+import os
+import tempfile
+
+import numpy as np
+
+import hashlife
+import patterns
+import rules
+import simulation
+
+# Ida y vuelta de los formatos .rle y .mc: lo que se escribe se vuelve a leer
+# igual, y los ejemplos escritos a mano en el formato de Golly se leen bien.
+#   python -m pytest test_patterns.py    o    python test_patterns.py
+
+GLIDER = {(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)}
+
+
+def tmp_path(name):
+    return os.path.join(tempfile.mkdtemp(), name)
+
+
+def soup(count=400, spread=150, seed=6):
+    rng = np.random.default_rng(seed)
+    cells = rng.integers(-spread, spread, size=(count, 2))
+    # un tramo largo obliga a partir la línea de 70 caracteres
+    cells = np.concatenate((cells, [(c, 3) for c in range(-40, 60)]))
+    return set(map(tuple, cells.tolist()))
+
+
+def write_macrocell(path, universe, rule_str):
+    # el escritor mínimo de Golly: hojas de 8 x 8 y nodos "nivel nw ne sw se"
+    ids, lines = {}, []
+
+    def emit(node):
+        if node.population == 0:
+            return 0
+        if node not in ids:
+            if node.level == 3:
+                rows = hashlife.block(node)
+                lines.append("$".join("".join("*" if v else "." for v in row) for row in rows) + "$")
+            else:
+                children = [emit(child) for child in (node.nw, node.ne, node.sw, node.se)]
+                lines.append(f"{node.level} " + " ".join(map(str, children)))
+            ids[node] = len(lines)
+        return ids[node]
+
+    emit(universe.root)
+    with open(path, "w") as f:
+        f.write(f"[M2] (prueba)\n#R {rule_str}\n" + "\n".join(lines) + "\n")
+
+
+def test_rle_round_trip():
+    for cells, rule_str in ((soup(), "B36/S23"), (GLIDER, "B3/S23"), (set(), "B2/S"), ({(-7, 9)}, "B3/S23")):
+        path = tmp_path("patron.rle")
+        patterns.write_rle(path, cells, rule_str)
+        assert patterns.read_rle(path) == (cells, rule_str)
+
+
+def test_rle_golly():
+    path = tmp_path("glider.rle")
+    with open(path, "w") as f:
+        f.write("#N Glider\n#C comentario\nx = 3, y = 3, rule = 23/3\nbo$2bo$3o!\n")
+    assert patterns.read_rle(path) == (GLIDER, "B3/S23")
+    with open(path, "w") as f:
+        f.write("#CXRLE Pos=-5,10\nx = 3, y = 2, rule = B2/S/C3\n.A$2A.!\n")
+    assert patterns.read_rle(path) == ({(-4, 10), (-5, 11), (-4, 11)}, "B2/S/C3")
+
+
+def test_simulation_rle():
+    sim = simulation.Simulation(300, 300, "B36/S23", "infinita", timeline=False, detect_cycles=False)
+    sim.positions = soup()
+    path = tmp_path("sim.rle")
+    sim.save(path)
+    other = simulation.Simulation(300, 300, "B3/S23", "infinita", timeline=False, detect_cycles=False)
+    other.load(path)
+    assert other.positions == sim.positions and other.rule_str == "B36/S23"
+
+
+def test_macrocell_round_trip():
+    universe = hashlife.HashLife(rules.compile_rule("B36/S23"))
+    universe.from_positions(soup())
+    expected = universe.pattern().to_positions()
+    path = tmp_path("patron.mc")
+    write_macrocell(path, universe, "B36/S23")
+    loaded, rule_str = patterns.read_macrocell(path)
+    assert rule_str == "B36/S23"
+    # la raíz queda centrada en (0, 0): las células se corren lo mismo que el origen
+    half = 1 << (loaded.root.level - 1)
+    dx, dy = -half - universe.origin[0], -half - universe.origin[1]
+    assert loaded.pattern().to_positions() == {(c + dx, r + dy) for c, r in expected}
+
+
+def test_macrocell_golly():
+    path = tmp_path("glider.mc")
+    with open(path, "w") as f:
+        f.write("[M2] (golly 4.0)\n#R 23/3\n.*$..*$***$\n4 1 0 0 0\n")
+    universe, rule_str = patterns.read_macrocell(path)
+    assert rule_str == "B3/S23"
+    assert universe.pattern().to_positions() == {(c - 8, r - 8) for c, r in GLIDER}
+    # la simulación lo centra en la ventana y lo deja como tablero de hashlife
+    sim = simulation.Simulation(40, 30, timeline=False, detect_cycles=False)
+    sim.load(path)
+    assert (sim.engine, sim.boundary) == ("hashlife", "infinita")
+    assert sim.positions == {(c + 12, r + 7) for c, r in GLIDER}
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
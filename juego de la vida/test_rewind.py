@@ -0,0 +1,101 @@
+import numpy as np
+
+import rewind
+import simulation
+
+# Historial para retroceder: seek() devuelve el tablero de cada generación
+# grabada, también al cruzar keyframes, después de descartar una rama y con
+# coordenadas que no caben en 32 bits.
+#   python -m pytest test_rewind.py    o    python test_rewind.py
+
+
+def random_boards(count, seed=5, offset=(0, 0)):
+    rng = np.random.default_rng(seed)
+    boards = []
+    for _ in range(count):
+        cells = rng.integers(0, 40, size=(rng.integers(0, 60), 2)) + offset
+        boards.append(set(map(tuple, cells.tolist())))
+    return boards
+
+
+def record_all(timeline, boards):
+    # la primera generación va como keyframe, las demás como deltas
+    for i, board in enumerate(boards):
+        changed = boards[i - 1] ^ board if i else None
+        timeline.record(i, lambda board=board: board, changed)
+
+
+def test_seek():
+    for offset in ((0, 0), (-20, -20), (2 ** 31 + 3, -(2 ** 40))):
+        boards = random_boards(50, offset=offset)
+        timeline = rewind.Timeline(keyframe_interval=8)
+        record_all(timeline, boards)
+        assert (timeline.first, timeline.last) == (0, 49)
+        for generation, board in enumerate(boards):
+            found, cells = timeline.seek(generation)
+            assert found == generation
+            assert rewind.decode(cells) == board, (offset, generation)
+        assert timeline.previous(0) is None and timeline.previous(30) == 29
+
+
+def test_branch():
+    # grabar en una generación ya grabada descarta lo que seguía
+    boards = random_boards(30)
+    timeline = rewind.Timeline(keyframe_interval=8)
+    record_all(timeline, boards)
+    other = random_boards(10, seed=9)
+    timeline.record(12, lambda: other[0])
+    for i in range(1, 10):
+        timeline.record(12 + i, lambda: other[i], other[i - 1] ^ other[i])
+    assert timeline.last == 21
+    for generation in range(12):
+        assert rewind.decode(timeline.seek(generation)[1]) == boards[generation]
+    for i in range(10):
+        assert rewind.decode(timeline.seek(12 + i)[1]) == other[i]
+    # más allá de lo grabado queda la última
+    assert timeline.seek(100)[0] == 21
+
+
+def test_budget():
+    # con poco presupuesto se descartan los segmentos viejos, nunca el último
+    boards = random_boards(80)
+    timeline = rewind.Timeline(keyframe_interval=8, budget=4000)
+    record_all(timeline, boards)
+    assert timeline.nbytes <= 4000 or len(timeline.segments) == 1
+    assert timeline.first > 0 and timeline.last == 79
+    assert timeline.seek(timeline.first - 1) is None
+    for generation in range(timeline.first, 80):
+        assert rewind.decode(timeline.seek(generation)[1]) == boards[generation]
+
+
+def test_xor_cells():
+    for offset in ((0, 0), (-(2 ** 33), 2 ** 31)):
+        a, b, c = random_boards(3, seed=2, offset=offset)
+        arrays = [rewind.encode(board) for board in (a, b, c)]
+        assert rewind.decode(rewind.xor_cells(arrays)) == a ^ b ^ c
+
+
+def test_simulation_rewind():
+    # retroceder en la simulación vuelve por los mismos tableros
+    for engine, boundary in (("densa", "toro"), ("bits", "nula"), ("set", "toro"),
+                             ("densa", "infinita"), ("hashlife", "infinita")):
+        sim = simulation.Simulation(50, 40, "B36/S23", boundary, engine, detect_cycles=False)
+        sim.timeline.keyframe_interval = 16
+        sim.generate_random(0.3, seed=4)
+        seen = [sim.positions]
+        for _ in range(70):
+            sim.step()
+            seen.append(sim.positions)
+        while sim.rewind():
+            assert sim.positions == seen[sim.iteration], (engine, sim.iteration)
+        assert sim.iteration == 0
+        # después de retroceder se puede seguir avanzando por otra rama
+        sim.run(5)
+        assert sim.positions == seen[5], engine
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
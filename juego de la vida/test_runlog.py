@@ -0,0 +1,110 @@
+import json
+import os
+import struct
+import tempfile
+import zlib
+
+import runlog
+import simulation
+
+# Lectura del registro de corrida: lo que la simulación anota en cada paso se
+# vuelve a leer igual con read_log (memmap) y read_delta.
+#   python -m pytest test_runlog.py    o    python test_runlog.py
+
+
+def tmp_path(name):
+    return os.path.join(tempfile.mkdtemp(), name)
+
+
+def expected_run(engine, boundary, generations=30):
+    # (iteración, población, nacimientos, muertes, caja, células cambiadas) de cada paso
+    sim = simulation.Simulation(60, 40, "B36/S23", boundary, engine, timeline=False, detect_cycles=False)
+    sim.generate_random(0.3, seed=8)
+    rows = []
+    for _ in range(generations):
+        old = sim.positions
+        sim.step()
+        new = sim.positions
+        rows.append((sim.iteration, len(new), len(new - old), len(old - new),
+                     runlog.bbox_of_cells(new), old ^ new))
+    return rows
+
+
+def logged_run(engine, boundary, path, generations=30):
+    sim = simulation.Simulation(60, 40, "B36/S23", boundary, engine, timeline=False, detect_cycles=False)
+    sim.generate_random(0.3, seed=8)
+    sim.start_log(path, deltas=True)
+    for _ in range(generations):
+        sim.step()
+    sim.close()
+
+
+def test_read_back():
+    for engine, boundary in (("densa", "toro"), ("bits", "nula"), ("set", "toro"), ("densa", "infinita"),
+                             ("hashlife", "infinita")):
+        path = tmp_path("corrida.log")
+        logged_run(engine, boundary, path)
+        header, _ = runlog.read_header(path)
+        assert (header["rule"], header["boundary"], header["deltas"]) == ("B36/S23", boundary, True)
+        records = runlog.read_log(path)
+        expected = expected_run(engine, boundary)
+        assert len(records) == len(expected), engine
+        for record, (iteration, population, births, deaths, box, changed) in zip(records, expected):
+            assert record["iteration"] == iteration, (engine, iteration)
+            assert (record["population"], record["births"], record["deaths"]) == (population, births, deaths)
+            assert tuple(record[["min_col", "min_row", "max_col", "max_row"]].tolist()) == box
+            assert record["step_time"] >= 0
+            assert runlog.read_delta(path, record, header) == changed, (engine, iteration)
+
+
+def test_blocks_and_append():
+    # con un búfer de 4 registros se escribe por bloques; al volver a abrir
+    # el archivo se sigue anexando detrás de la misma cabecera
+    path = tmp_path("bloques.log")
+    for start in (0, 10):
+        with runlog.RunLog(path, "B3/S23", "toro", buffer_records=4) as log:
+            for i in range(start, start + 10):
+                log.log(i, i * 2, i, 0, (0, 0, i, i), 0.5)
+    records = runlog.read_log(path)
+    assert records["iteration"].tolist() == list(range(20))
+    assert records["population"].tolist() == [2 * i for i in range(20)]
+    assert records["max_col"].tolist() == list(range(20))
+    assert (records["delta_offset"] == -1).all()
+    assert runlog.read_delta(path, records[0]) is None
+
+
+def test_empty_and_invalid():
+    path = tmp_path("vacio.log")
+    runlog.RunLog(path).close()
+    assert len(runlog.read_log(path)) == 0
+    other = tmp_path("otro.log")
+    with open(other, "wb") as f:
+        f.write(b"no es un registro")
+    try:
+        runlog.read_header(other)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("read_header aceptó un archivo que no es un registro")
+
+
+def test_int32_deltas():
+    # los registros anteriores a "delta_dtype" guardaban las células en int32
+    path = tmp_path("viejo.log")
+    header = json.dumps({"rule": "B3/S23", "boundary": "toro", "deltas": True}).encode()
+    with open(path, "wb") as f:
+        f.write(runlog.MAGIC + struct.pack("<I", len(header)) + header)
+    with runlog.RunLog(path, deltas=True) as log:
+        log.log(1, 2, 2, 0, changed={(3, 4), (5, 6)})
+    with open(path + ".deltas", "rb") as f:
+        (size,) = struct.unpack("<I", f.read(4))
+        assert len(zlib.decompress(f.read(size))) == 2 * 2 * 4
+    record = runlog.read_log(path)[0]
+    assert runlog.read_delta(path, record) == {(3, 4), (5, 6)}
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
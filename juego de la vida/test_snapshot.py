@@ -0,0 +1,83 @@
+import os
+import tempfile
+
+import numpy as np
+
+import simulation
+import snapshot
+
+# Instantáneas .vida: region() devuelve la misma ventana que el arreglo
+# original con y sin compresión, con varios planos de estados y ventanas que
+# se salen del tablero; la simulación guarda y carga por bandas.
+#   python -m pytest test_snapshot.py    o    python test_snapshot.py
+
+COMPRESSIONS = [None, "zlib", "lzma"]
+
+
+def tmp_path(name):
+    return os.path.join(tempfile.mkdtemp(), name)
+
+
+def windows(height, width, count=40, seed=1):
+    rng = np.random.default_rng(seed)
+    yield 0, height, 0, width
+    yield -5, 3, width - 2, width + 9
+    for _ in range(count):
+        r0, c0 = rng.integers(-10, height), rng.integers(-10, width)
+        yield r0, r0 + rng.integers(0, 40), c0, c0 + rng.integers(0, 40)
+
+
+def test_region():
+    rng = np.random.default_rng(3)
+    for states in (2, 5):
+        grid = rng.integers(0, states, size=(53, 45)).astype(np.uint8)
+        for compression in COMPRESSIONS:
+            for mmap in (True, False):
+                path = tmp_path("tablero.vida")
+                # bloques de 16 filas: las ventanas cruzan varios
+                snapshot.save(path, grid, compression=compression, chunk_rows=16)
+                snap = snapshot.load(path, mmap)
+                assert (snap.width, snap.height, snap.compression) == (45, 53, compression)
+                for r0, r1, c0, c1 in windows(*grid.shape):
+                    expected = grid[max(r0, 0):max(r1, 0), max(c0, 0):max(c1, 0)]
+                    assert np.array_equal(snap.region(r0, r1, c0, c1), expected), (compression, r0, r1, c0, c1)
+                assert np.array_equal(snap.grid(), grid)
+                assert [band for band in snap.bands()] == [(0, 16), (16, 32), (32, 48), (48, 53)]
+
+
+def test_cells():
+    rng = np.random.default_rng(4)
+    cells = set(map(tuple, rng.integers(-300, 300, size=(500, 2)).tolist()))
+    for compression in COMPRESSIONS:
+        path = tmp_path("patron.vida")
+        snapshot.save_positions(path, cells, compression=compression, chunk_rows=64)
+        snap = snapshot.load(path)
+        assert snap.positions() == cells
+        assert snap.cells().dtype == np.int64
+
+
+def test_simulation():
+    for boundary in ("toro", "infinita"):
+        for compression in COMPRESSIONS:
+            sim = simulation.Simulation(70, 40, "B36/S23", boundary, timeline=False, detect_cycles=False)
+            sim.generate_random(0.3, seed=6)
+            sim.run(7)
+            path = tmp_path("sim.vida")
+            sim.save(path, compression)
+            snap = snapshot.load(path)
+            assert snap.compression == compression
+            other = simulation.Simulation(70, 40, "B3/S23", "nula", timeline=False, detect_cycles=False)
+            other.load_snapshot(snap)
+            assert other.positions == sim.positions
+            assert (other.rule_str, other.boundary, other.iteration) == ("B36/S23", boundary, 7)
+            # de otro tamaño se carga como posiciones
+            small = simulation.Simulation(20, 20, timeline=False, detect_cycles=False)
+            small.load(path)
+            assert small.positions == sim.positions
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
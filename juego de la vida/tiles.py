@@ -0,0 +1,135 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+import dense
+
+# Motor por teselas: el tablero se divide en bloques de TILE x TILE células y
+# sólo se recalculan los bloques cuya vecindad (el bloque y sus 8 vecinos)
+# cambió respecto a dos generaciones atrás. Si toda la vecindad repite el
+# estado de t-2 (periodo 1 o 2), el bloque queda congelado y su siguiente
+# estado es el de t-1, sin calcular nada.
+
+TILE = 32
+
+
+class TiledLife:
+    def __init__(self, width, height, rule, boundary, tile=TILE):
+        self.width = width
+        self.height = height
+        self.boundary = boundary
+        self.tile = tile
+        if not rule.totalistic:
+            raise ValueError("el motor por teselas sólo admite reglas totalistas B/S")
+        self.table = rule.table
+        self.tile_rows = -(-height // tile)
+        self.tile_cols = -(-width // tile)
+        padded_shape = (self.tile_rows * tile, self.tile_cols * tile)
+        # celdas reales dentro del tablero ajustado a múltiplos de TILE
+        self.valid = np.zeros(padded_shape, dtype=np.uint8)
+        self.valid[:height, :width] = 1
+        # los tableros llevan un marco de una célula para leer las ventanas de
+        # cada bloque sin volver a rellenar todo el arreglo en cada paso
+        framed_shape = (padded_shape[0] + 2, padded_shape[1] + 2)
+        self.frame = np.zeros(framed_shape, dtype=np.uint8)  # t
+        self.prev_frame = np.zeros(framed_shape, dtype=np.uint8)  # t - 1
+        shape = (self.tile_rows, self.tile_cols)
+        # periodo 2: el bloque en t es igual que en t - 2
+        self.stable2 = np.zeros(shape, dtype=bool)
+        # periodo 1: el bloque en t es igual que en t - 1
+        self.stable1 = np.zeros(shape, dtype=bool)
+        # bloques cuyo estado en t no salió de aplicar la regla a t - 1 (recién
+        # cargados o editados); su comparación con t - 2 no sirve hasta que se
+        # recalculen dos veces
+        self.edited = np.ones(shape, dtype=bool)
+        # (activos, congelados en periodo 2, quietos) por generación
+        self.tile_history = []
+
+    @property
+    def grid(self):
+        return self.frame[1:-1, 1:-1]
+
+    @property
+    def prev(self):
+        return self.prev_frame[1:-1, 1:-1]
+
+    def tiles_of(self, grid):
+        t = self.tile
+        return grid.reshape(self.tile_rows, t, self.tile_cols, t)
+
+    def load(self, pos_set):
+        self.load_grid(dense.positions_to_grid(pos_set, self.width, self.height))
+
+    def load_grid(self, new):
+        # los bloques editados desde fuera pierden su estabilidad. Se arma un
+        # marco nuevo: el anterior puede estar publicado (ver board())
+        frame = np.zeros_like(self.frame)
+        frame[1:self.height + 1, 1:self.width + 1] = new
+        touched = self.tiles_of(frame[1:-1, 1:-1] != self.grid).any(axis=(1, 3))
+        self.stable2 &= ~touched
+        self.stable1 &= ~touched
+        self.edited |= touched
+        self.frame = frame
+
+    def board(self):
+        # el tablero real sin copiarlo: step() escribe en un arreglo nuevo y
+        # sólo toca el marco y el relleno del actual
+        return self.grid[:self.height, :self.width]
+
+    def to_positions(self):
+        return dense.grid_to_positions(self.board())
+
+    def active_tiles(self):
+        unstable = ~self.stable2
+        mode = "wrap" if self.boundary == "toro" else "constant"
+        padded = np.pad(unstable, 1, mode=mode)
+        rows = padded[:-2] | padded[1:-1] | padded[2:]
+        return rows[:, :-2] | rows[:, 1:-1] | rows[:, 2:]
+
+    def wrap_frame(self):
+        # con borde "toro" el marco copia las filas y columnas opuestas;
+        # con "nula" se queda en cero
+        if self.boundary != "toro":
+            return
+        f, h, w = self.frame, self.height, self.width
+        f[0, 1:w + 1] = f[h, 1:w + 1]
+        f[h + 1, 1:w + 1] = f[1, 1:w + 1]
+        f[0:h + 2, 0] = f[0:h + 2, w]
+        f[0:h + 2, w + 1] = f[0:h + 2, 1]
+
+    def unwrap_frame(self):
+        # si el tablero no es múltiplo de TILE, la fila/columna que hace de
+        # marco cae dentro del relleno de los últimos bloques y debe volver a cero
+        f, h, w = self.frame, self.height, self.width
+        if h + 1 < f.shape[0] - 1:
+            f[h + 1] = 0
+        if w + 1 < f.shape[1] - 1:
+            f[:, w + 1] = 0
+
+    def step(self):
+        t = self.tile
+        active = self.active_tiles()
+        ar, ac = np.nonzero(active)
+        new_frame = self.prev_frame.copy()
+        if len(ar):
+            self.wrap_frame()
+            windows = sliding_window_view(self.frame, (t + 2, t + 2))[::t, ::t][ar, ac]
+            self.unwrap_frame()
+            vertical = windows[:, :-2] + windows[:, 1:-1] + windows[:, 2:]
+            counts = vertical[:, :, :-2] + vertical[:, :, 1:-1] + vertical[:, :, 2:]
+            cells = windows[:, 1:-1, 1:-1]
+            counts -= cells
+            result = self.table[counts, cells] & self.tiles_of(self.valid)[ar, :, ac, :]
+            self.tiles_of(new_frame[1:-1, 1:-1])[ar, :, ac, :] = result
+            # sólo los bloques calculados pueden cambiar de estabilidad
+            self.stable2[ar, ac] = (result == self.tiles_of(self.prev)[ar, :, ac, :]).all(axis=(1, 2))
+            self.stable1[ar, ac] = (result == cells).all(axis=(1, 2))
+        self.stable2 &= ~self.edited
+        self.edited[:] = False
+        frozen = int((~active & ~self.stable1).sum())
+        idle = active.size - len(ar) - frozen
+        self.tile_history.append((len(ar), frozen, idle))
+        self.prev_frame, self.frame = self.frame, new_frame
+
+    @property
+    def population(self):
+        return int(self.grid[:self.height, :self.width].sum())
@@ -1,9 +1,12 @@
 import pygame
 import random
-import json
 import math
-import matplotlib.pyplot as plt
-from tkinter import filedialog, Tk
+import time
+import rules
+import ensemble
+import render
+import simulation
+import background
 
 pygame.init()
 
@@ -17,92 +20,127 @@ CELL_COLOR = YELLOW
 BG_COLOR = GREY
 WIDTH, HEIGHT = 800, 800
 cell_size = 5
+# con lod > 0 la vista está alejada: cada píxel es un bloque de 2^lod x 2^lod
+# células pintado según su densidad
+lod = 0
 viewport_x, viewport_y = 0, 0
 FPS = 60
 
-# Espacio lógico
+# Espacio lógico: el estado, la regla, el borde y el motor viven en la
+# simulación; aquí sólo queda la vista
 GRID_WIDTH = 1000
 GRID_HEIGHT = 1000
-positions = set()
-history = []
-iteration = 0
-rule_str = "B3/S23"
-boundary = "toro"
+sim = simulation.Simulation(GRID_WIDTH, GRID_HEIGHT)
+MAX_LOD = (max(GRID_WIDTH, GRID_HEIGHT) - 1).bit_length()  # todo el tablero en un píxel
+LOG_DELTAS = False  # guardar también el delta comprimido de cada generación
 
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 clock = pygame.time.Clock()
-
-def parse_rule(rule):
-    b, s = rule.split('/')
-    birth = list(map(int, b[1:]))
-    survive = list(map(int, s[1:]))
-    return birth, survive
-
-def get_neighbors(pos):
-    col, row = pos
-    neighbors = []
-    for dc in [-1, 0, 1]:
-        for dr in [-1, 0, 1]:
-            if dc == 0 and dr == 0:
-                continue
-            nc, nr = col + dc, row + dr
-            if boundary == "toro":
-                nc %= GRID_WIDTH
-                nr %= GRID_HEIGHT
-            if 0 <= nc < GRID_WIDTH and 0 <= nr < GRID_HEIGHT:
-                neighbors.append((nc, nr))
-    return neighbors
-
-def adjust_grid(pos_set):
-    birth, survive = parse_rule(rule_str)
-    new_positions = set()
-    candidates = set()
-    for p in pos_set:
-        candidates.add(p)
-        candidates.update(get_neighbors(p))
-    for cell in candidates:
-        count = sum((n in pos_set) for n in get_neighbors(cell))
-        if cell in pos_set and count in survive:
-            new_positions.add(cell)
-        elif cell not in pos_set and count in birth:
-            new_positions.add(cell)
-    return new_positions
-
-def draw_grid():
-    for cell in positions:
-        col, row = cell
-        sx = (col - viewport_x) * cell_size
-        sy = (row - viewport_y) * cell_size
-        if 0 <= sx < WIDTH and 0 <= sy < HEIGHT:
-            pygame.draw.rect(screen, CELL_COLOR, (sx, sy, cell_size, cell_size))
+renderer = render.Renderer(screen)
+MAX_DIRTY_RECTS = 2000  # con más células cambiadas en la vista se repinta todo
+sim.track_changes = True
+# la simulación corre en otro hilo; la ventana dibuja la última foto publicada
+worker = background.SimulationThread(sim, fps=FPS)
+
+def visible_cells():
+    # columnas y filas del tablero que caben en la ventana
+    if lod:
+        return WIDTH << lod, HEIGHT << lod
+    return WIDTH // cell_size, HEIGHT // cell_size
+
+def screen_to_cell(mx, my):
+    if lod:
+        return (mx << lod) + viewport_x, (my << lod) + viewport_y
+    return mx // cell_size + viewport_x, my // cell_size + viewport_y
+
+def zoom(direction):
+    # por debajo de 1 píxel por célula se pasa a los niveles de la pirámide
+    global cell_size, lod
+    if direction > 0:
+        if lod:
+            lod -= 1
+        else:
+            cell_size = min(10, cell_size + 1)
+    elif cell_size > 1:
+        cell_size -= 1
+    else:
+        lod = min(MAX_LOD, lod + 1)
+    if worker.levels != ((lod,) if lod else ()):
+        worker.set_levels((lod,) if lod else ())
+    pan(0, 0)
+
+def pan(dx, dy):
+    # en el plano infinito la vista se mueve sin límites; alejada, el paso
+    # crece con el tamaño del bloque
+    global viewport_x, viewport_y
+    viewport_x += dx << lod
+    viewport_y += dy << lod
+    if sim.boundary != "infinita":
+        cols, rows = visible_cells()
+        viewport_x = max(0, min(GRID_WIDTH - cols, viewport_x))
+        viewport_y = max(0, min(GRID_HEIGHT - rows, viewport_y))
+
+def draw_grid(frame):
+    # una sola superficie del tamaño de la vista, escalada y copiada de una vez
+    if lod:
+        if lod not in frame.levels:
+            return  # la foto con este nivel llega en el próximo cuadro
+        view = frame.density_view(lod, viewport_x, viewport_y, WIDTH, HEIGHT)
+        renderer.draw(view, 1, render.density_palette(CELL_COLOR, BG_COLOR))
+        return
+    cols, rows = render.view_shape(WIDTH, HEIGHT, cell_size)
+    view = frame.view(viewport_x, viewport_y, cols, rows)
+    renderer.draw(view, cell_size, render.state_palette(frame.state_count, CELL_COLOR, BG_COLOR))
+
+def draw_changes(frame, changes):
+    # repinta sólo las células cambiadas que caen en la vista; devuelve los
+    # rectángulos a actualizar o None si conviene repintar todo
+    if lod:
+        return None
+    cols, rows = render.view_shape(WIDTH, HEIGHT, cell_size)
+    c = changes[:, 0] - viewport_x
+    r = changes[:, 1] - viewport_y
+    inside = (c >= 0) & (c < cols) & (r >= 0) & (r < rows)
+    if inside.sum() > MAX_DIRTY_RECTS:
+        return None
+    c, r = c[inside], r[inside]
+    states = frame.states_at(c + viewport_x, r + viewport_y)
+    return renderer.draw_cells(c, r, states, cell_size, render.state_palette(frame.state_count, CELL_COLOR, BG_COLOR))
+
+def toggle_playing():
+    # corre en el hilo de la simulación, después de las ediciones anteriores
+    if sim.population == 0:
+        print("⚠ No hay células vivas. Presiona G para generar o dibuja una.")
+    else:
+        worker.playing = not worker.playing
+
+PATTERN_TYPES = [("Instantánea", "*.vida"), ("RLE", "*.rle"), ("Macrocell de Golly", "*.mc"), ("JSON", "*.json")]
 
 def save_config():
+    # tkinter y matplotlib se importan al usarse: cargarlos al inicio
+    # retrasaba la ventana casi un segundo (ver import_budget.py)
+    from tkinter import filedialog, Tk
     Tk().withdraw()
-    path = filedialog.asksaveasfilename(defaultextension=".json")
+    path = filedialog.asksaveasfilename(defaultextension=".vida", filetypes=PATTERN_TYPES)
     if path:
-        data = {
-            "positions": list(positions),
-            "rule": rule_str,
-            "boundary": boundary
-        }
-        with open(path, 'w') as f:
-            json.dump(data, f)
+        worker.edit(sim.save, path)
 
 def load_config():
-    global positions, rule_str, boundary
+    from tkinter import filedialog, Tk
     Tk().withdraw()
-    path = filedialog.askopenfilename()
-    if path:
-        with open(path) as f:
-            data = json.load(f)
-            positions.clear()
-            positions.update(map(tuple, data["positions"]))
-            rule_str = data.get("rule", "B3/S23")
-            boundary = data.get("boundary", "toro")
+    path = filedialog.askopenfilename(filetypes=PATTERN_TYPES + [("Todos", "*")])
+    if not path:
+        return False
+    # un archivo que no se puede cargar se informa desde el hilo de la simulación
+    worker.edit(sim.load, path)
+    return True
 
 def plot_density():
+    # la copia de la lista es atómica: no hace falta esperar al paso en curso
+    history = list(sim.history)
     if not history:
         return
+    import matplotlib.pyplot as plt
     plt.figure("Densidad")
     plt.plot(history, label="Normal")
     plt.legend()
@@ -112,67 +150,96 @@ def plot_density():
     plt.legend()
     plt.show()
 
-def generate_clustered_cells(num_clusters=15, cells_per_cluster=2000, cluster_radius=30):
-    positions.clear()
-    for _ in range(num_clusters):
-        center_col = random.randint(100, GRID_WIDTH - 100)
-        center_row = random.randint(100, GRID_HEIGHT - 100)
-        for _ in range(cells_per_cluster):
-            dx = random.randint(-cluster_radius, cluster_radius)
-            dy = random.randint(-cluster_radius, cluster_radius)
-            col = (center_col + dx) % GRID_WIDTH
-            row = (center_row + dy) % GRID_HEIGHT
-            positions.add((col, row))
+def plot_ensemble(boards=16, generations=300, amount=150000):
+    # curvas de densidad promediadas sobre varias sopas aleatorias, avanzadas
+    # juntas como un solo arreglo (N, H, W)
+    if sim.multi_state_rule() is not None:
+        print("⚠ El conjunto sólo admite reglas B/S.")
+        return
+    print(f"⏳ Simulando {boards} tableros {generations} generaciones...")
+    pops, mean, variance = ensemble.run_ensemble(
+        boards, GRID_WIDTH, GRID_HEIGHT, rules.compile_rule(sim.rule_str), sim.boundary,
+        generations, amount)
+    import matplotlib.pyplot as plt
+    std = variance ** 0.5
+    plt.figure("Densidad (conjunto)")
+    plt.plot(pops, color="grey", alpha=0.2)
+    plt.plot(mean, label="Media")
+    plt.fill_between(range(len(mean)), mean - std, mean + std, alpha=0.3, label="±1 desv.")
+    plt.legend()
+    plt.figure("Varianza (conjunto)")
+    plt.plot(variance, label="Varianza")
+    plt.legend()
+    plt.show()
 
 def main():
-    global positions, cell_size, viewport_x, viewport_y, CELL_COLOR, BG_COLOR
-    global iteration, boundary, rule_str
+    global viewport_x, viewport_y, CELL_COLOR, BG_COLOR
 
     running = True
-    playing = False
-    step_mode = False
-    frame_counter = 0
-    delay_between_steps = 10
+    full_redraw = True
+    caption = None
+    speed = (time.perf_counter(), 0, 0.0)  # (momento, generación, gen/s) para el título
+    worker.start()
 
     while running:
-        screen.fill(BG_COLOR)
-        draw_grid()
-        pygame.display.set_caption(f"Iter: {iteration}  Vivas: {len(positions)}  Rule: {rule_str}  Boundary: {boundary}")
-        pygame.display.update()
+        # sólo se repinta lo que cambió; pan, zoom, colores o un tablero
+        # nuevo repintan toda la ventana
+        frame, fresh = worker.take()
+        rects = []
+        if full_redraw or (fresh and frame.changes is None):
+            rects = None
+        elif fresh and len(frame.changes):
+            rects = draw_changes(frame, frame.changes)
+        if rects is None:
+            screen.fill(BG_COLOR)
+            draw_grid(frame)
+            pygame.display.update()
+        elif rects:
+            pygame.display.update(rects)
+        full_redraw = False
+        now = time.perf_counter()
+        if now - speed[0] >= 1:
+            speed = (now, frame.iteration, (frame.iteration - speed[1]) / (now - speed[0]))
+        mode = f"  Warp: {speed[2]:.0f} gen/s" if worker.warp else ""
+        text = f"Iter: {frame.iteration}  Vivas: {frame.population}  Rule: {frame.rule_str}  Boundary: {frame.boundary}  Motor: {frame.engine}{frame.status}{mode}"
+        if text != caption:
+            pygame.display.set_caption(text)
+            caption = text
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
 
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                full_redraw = True
+
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     mx, my = pygame.mouse.get_pos()
-                    col = mx // cell_size + viewport_x
-                    row = my // cell_size + viewport_y
-                    pos = (col, row)
-                    if pos in positions:
-                        positions.remove(pos)
-                    else:
-                        positions.add(pos)
+                    worker.edit(sim.toggle, screen_to_cell(mx, my))
                 elif event.button == 4:  # Scroll up
-                    cell_size = min(10, cell_size + 1)
+                    zoom(1)
+                    full_redraw = True
                 elif event.button == 5:  # Scroll down
-                    cell_size = max(1, cell_size - 1)
+                    zoom(-1)
+                    full_redraw = True
 
             elif event.type == pygame.KEYDOWN:
+                # las teclas mueven la vista, cambian colores o abren ventanas
+                full_redraw = True
                 if event.key == pygame.K_SPACE:
-                    if len(positions) == 0:
-                        print("⚠ No hay células vivas. Presiona G para generar o dibuja una.")
-                    else:
-                        playing = not playing
+                    worker.edit(toggle_playing)
 
                 elif event.key == pygame.K_n:
-                    step_mode = True
+                    worker.step()
+
+                elif event.key == pygame.K_t:
+                    # warp: tantas generaciones como se pueda entre cuadros
+                    worker.warp = not worker.warp
+                    print(f"Warp: {worker.warp}")
 
                 elif event.key == pygame.K_c:
-                    positions.clear()
-                    iteration = 0
-                    history.clear()
+                    worker.edit(sim.clear)
 
                 elif event.key == pygame.K_s:
                     save_config()
@@ -183,25 +250,57 @@ def main():
                 elif event.key == pygame.K_d:
                     plot_density()
 
+                elif event.key == pygame.K_m:
+                    plot_ensemble()
+
                 elif event.key == pygame.K_r:
-                    rule_str = input("Regla B/S: (ej: B3/S23) ")
+                    rule = input("Regla B/S o LtL: (ej: B3/S23, B2/S/C3, R5,C0,M1,S34..58,B34..45,NM) ")
+                    # una regla inválida se informa al aplicarse
+                    worker.edit(sim.set_rule, rule)
 
                 elif event.key == pygame.K_b:
-                    boundary = "nula" if boundary == "toro" else "toro"
+                    worker.edit(sim.cycle_boundary)
+
+                elif event.key == pygame.K_e:
+                    worker.edit(sim.cycle_engine, done=lambda _: print(f"Motor: {sim.engine}"))
+
+                elif event.key == pygame.K_h:
+                    worker.edit(sim.cycle_neighborhood, done=lambda _: print(f"Vecindad: {sim.neighborhood.name}"))
+
+                elif event.key == pygame.K_BACKSPACE:
+                    worker.playing = False
+                    worker.edit(sim.rewind, done=lambda ok: ok or print("⚠ No hay generaciones anteriores guardadas."))
+
+                elif event.key == pygame.K_o:
+                    if sim.run_log is None:
+                        path = time.strftime("corrida-%Y%m%d-%H%M%S.vidalog")
+                        worker.edit(sim.start_log, path, LOG_DELTAS)
+                        print(f"Registrando en {path}")
+                    else:
+                        worker.edit(sim.stop_log)
+                        print("Registro cerrado")
+
+                elif event.key == pygame.K_p:
+                    worker.edit(sim.toggle_stop_on_cycle, done=lambda on: print(f"Parar en ciclos: {on}"))
+
+                elif event.key == pygame.K_PERIOD:
+                    worker.edit(sim.change_step_exp, 1)
+                elif event.key == pygame.K_COMMA:
+                    worker.edit(sim.change_step_exp, -1)
 
                 elif event.key == pygame.K_z:
-                    cell_size = max(1, cell_size - 1)
+                    zoom(-1)
                 elif event.key == pygame.K_x:
-                    cell_size = min(10, cell_size + 1)
+                    zoom(1)
 
                 elif event.key in [pygame.K_UP, pygame.K_w]:
-                    viewport_y = max(0, viewport_y - 10)
+                    pan(0, -10)
                 elif event.key in [pygame.K_DOWN, pygame.K_s]:
-                    viewport_y = min(GRID_HEIGHT - HEIGHT // cell_size, viewport_y + 10)
+                    pan(0, 10)
                 elif event.key in [pygame.K_LEFT, pygame.K_a]:
-                    viewport_x = max(0, viewport_x - 10)
+                    pan(-10, 0)
                 elif event.key in [pygame.K_RIGHT, pygame.K_d]:
-                    viewport_x = min(GRID_WIDTH - WIDTH // cell_size, viewport_x + 10)
+                    pan(10, 0)
 
                 elif event.key == pygame.K_f:
                     CELL_COLOR = tuple(random.randint(100, 255) for _ in range(3))
@@ -210,28 +309,17 @@ def main():
                     BG_COLOR = tuple(random.randint(0, 150) for _ in range(3))
 
                 elif event.key == pygame.K_g:
-                    generate_clustered_cells()
-                    iteration = 0
-                    history.clear()
-                    viewport_x = GRID_WIDTH // 2 - WIDTH // (2 * cell_size)
-                    viewport_y = GRID_HEIGHT // 2 - HEIGHT // (2 * cell_size)
-
-        if (playing and frame_counter >= delay_between_steps) or step_mode:
-            positions_new = adjust_grid(positions)
-            if not positions_new:
-                playing = False
-                print("⚠ Todas las células han muerto.")
-            positions = positions_new
-            history.append(len(positions))
-            iteration += 1
-            frame_counter = 0
-            step_mode = False
-        else:
-            frame_counter += 1
+                    worker.edit(sim.generate_clustered)
+                    cols, rows = visible_cells()
+                    viewport_x = GRID_WIDTH // 2 - cols // 2
+                    viewport_y = GRID_HEIGHT // 2 - rows // 2
+                    pan(0, 0)
 
         clock.tick(FPS)
 
+    worker.stop()
+    sim.close()
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,127 @@
+import numpy as np
+
+import rewind
+
+# Hash de Zobrist del tablero: el XOR de una clave por cada palabra no vacía,
+# donde la clave mezcla la posición de la palabra con su contenido. En los
+# tableros nativos la palabra es un uint64 (64 células de bitlife u 8 células
+# o estados uint8); en el set de posiciones, cada célula viva. Las claves se
+# calculan con una sola pasada de splitmix64 en lugar de guardarse en una
+# tabla por célula. El tablero se hashea cada `every` pasos y una tabla
+# acotada hash -> generación detecta cuándo se vuelve periódico; al primer
+# repetido se hashea cada paso hasta dar con el periodo exacto.
+
+# multiplicador impar que reparte el índice de la palabra por los 64 bits
+INDEX_MIX = np.uint64(0xD6E8FEB86659FD93)
+
+
+def splitmix64(x):
+    with np.errstate(over="ignore"):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+def mix_coords(cols, rows):
+    # splitmix64 de la columna repartida por los 64 bits más la fila (int64,
+    # sin perder coordenadas más allá de 2^32)
+    with np.errstate(over="ignore"):
+        x = cols.astype(np.int64).view(np.uint64) * INDEX_MIX + rows.astype(np.int64).view(np.uint64)
+    return splitmix64(x)
+
+
+def xor_all(keys):
+    return int(np.bitwise_xor.reduce(keys)) if len(keys) else 0
+
+
+def as_words(array):
+    # el arreglo como palabras uint64 (8 células uint8 por palabra)
+    flat = np.ascontiguousarray(array).ravel()
+    if flat.dtype == np.uint64:
+        return flat
+    if flat.size % 8:
+        flat = np.concatenate((flat, np.zeros(-flat.size % 8, dtype=flat.dtype)))
+    return flat.view(np.uint64)
+
+
+def array_hash(array):
+    words = as_words(array)
+    index = np.flatnonzero(words)
+    with np.errstate(over="ignore"):
+        return xor_all(splitmix64(words[index] ^ (index.astype(np.uint64) * INDEX_MIX)))
+
+
+def cells_hash(cells):
+    cells = rewind.encode(cells)
+    return xor_all(mix_coords(cells[:, 0], cells[:, 1]))
+
+
+def board_hash(kind, board):
+    # `kind` es la forma del tablero: "grid", "words", "states", "cells" (set),
+    # "chunks" (mapa de trozos) o "hashlife" (la foto del quadtree trae su
+    # propio hash)
+    if kind == "cells":
+        return cells_hash(board)
+    if kind == "chunks":
+        return cells_hash(board.cells())
+    if kind == "hashlife":
+        return board.hash()
+    return array_hash(board)
+
+
+class CycleDetector:
+    def __init__(self, capacity=4096, every=16):
+        self.capacity = capacity
+        self.every = every
+        self.reset()
+
+    def reset(self, kind=None, board=None):
+        self.hash = 0 if board is None else board_hash(kind, board)
+        self.seen = {}
+        self.period = None
+        self.transient = None
+        self.stride = self.every
+        self.steps = 0
+
+    def update(self, kind, board):
+        # `board`: el tablero después del paso. Entre muestras el hash queda
+        # en None y record() no mira nada
+        if self.period is not None:
+            # ya es periódico: hasta el próximo reset no hay nada que aprender
+            return
+        self.steps += 1
+        if self.steps % self.stride and kind != "hashlife":
+            # hashlife se hashea siempre: el hash se memoriza por nodo y cada
+            # paso puede saltar 2^k generaciones
+            self.hash = None
+            return
+        self.hash = board_hash(kind, board)
+
+    def record(self, generation):
+        # devuelve (transitorio, periodo) si el estado ya apareció antes
+        if self.period is not None:
+            return self.transient, self.period
+        if self.hash is None:
+            return None
+        first = self.seen.get(self.hash)
+        if first is not None and self.stride > 1:
+            # entre muestras el periodo medido sería un múltiplo del real: el
+            # tablero ya es periódico, así que se hashea cada paso desde aquí
+            self.stride = 1
+            self.seen = {}
+            first = None
+        if first is not None:
+            self.transient, self.period = first, generation - first
+            return self.transient, self.period
+        self.seen[self.hash] = generation
+        if len(self.seen) > self.capacity:
+            del self.seen[next(iter(self.seen))]
+        return None
+
+    def steps_to(self, generation, target):
+        # pasos reales que hacen falta para llegar al estado de `target`
+        # una vez conocido el periodo
+        if self.period is None or generation < self.transient:
+            return target - generation
+        return (target - generation) % self.period